@@ -34,33 +34,108 @@ class Qwen3Prompt:
             tool_matches = self.tool_pattern.findall(assistant_content)
 
             for func_idx, func_json_str in enumerate(tool_matches):
-                func_json_str = func_json_str.strip()
-                try:
-                    tool_call = json.loads(func_json_str)
-
-                    func_name = tool_call.get("name")
-                    func_args = tool_call.get("arguments", {})
-
-                    if isinstance(func_args, (dict, list)):
-                        func_args_str = json.dumps(func_args, ensure_ascii=False)
-                    else:
-                        func_args_str = str(func_args)
-
-                    message["tool_calls"].append(
-                        {
-                            "id": f"call_{func_idx + 1}",
-                            "type": "function",
-                            "function": {"name": func_name, "arguments": func_args_str},
-                        }
-                    )
-                except json.JSONDecodeError as e:
-                    logger.warning(
-                        f"Failed to parse tool JSON: {func_json_str[:50]}... Error: {e}"
-                    )
-                    continue
+                tool_call = self.parse_tool_call(func_json_str, func_idx)
+                if tool_call is not None:
+                    message["tool_calls"].append(tool_call)
 
             assistant_content = self.tool_pattern.sub("", assistant_content)
 
         message["content"] = assistant_content.removesuffix(self.eos_token).strip()
 
         return message
+
+    def parse_tool_call(self, func_json_str: str, func_idx: int) -> dict | None:
+        func_json_str = func_json_str.strip()
+        try:
+            tool_call = json.loads(func_json_str)
+
+            func_name = tool_call.get("name")
+            func_args = tool_call.get("arguments", {})
+
+            if isinstance(func_args, (dict, list)):
+                func_args_str = json.dumps(func_args, ensure_ascii=False)
+            else:
+                func_args_str = str(func_args)
+
+            return {
+                "id": f"call_{func_idx + 1}",
+                "type": "function",
+                "function": {"name": func_name, "arguments": func_args_str},
+            }
+        except json.JSONDecodeError as e:
+            logger.warning(
+                f"Failed to parse tool JSON: {func_json_str[:50]}... Error: {e}"
+            )
+            return None
+
+    def tool_call_scanner(self) -> "Qwen3ToolCallScanner":
+        return Qwen3ToolCallScanner(self)
+
+
+class Qwen3ToolCallScanner:
+    """
+    Finds the complete tool call blocks of a response while it is being streamed.
+
+    Each call to `scan` receives the cumulative response and only searches the text added
+    since the previous call. Blocks are numbered the same way as `parse_assistant_content`,
+    and tool calls inside think blocks are ignored.
+    """
+
+    def __init__(self, prompter: Qwen3Prompt):
+        self.prompter = prompter
+
+        # Text before `_pos` has been searched.
+        self._pos = 0
+        # Start of the content of the open block and its closing token, if any.
+        self._block_start = 0
+        self._close_token: str | None = None
+        self._func_idx = 0
+
+    def scan(self, partial_content: str) -> list[tuple[int, dict | None]]:
+        """
+        Returns (func_idx, tool_call) for the tool call blocks completed since the last call.
+        Blocks that fail to parse have None as tool_call.
+        """
+        prompter = self.prompter
+        open_tokens = {
+            prompter.think_start_token: prompter.think_end_token,
+            prompter.bot_token: prompter.eot_token,
+        }
+
+        tool_calls = []
+        while True:
+            if self._close_token is None:
+                starts = [
+                    (idx, token)
+                    for token in open_tokens
+                    if (idx := partial_content.find(token, self._pos)) != -1
+                ]
+                if not starts:
+                    # An opening token may be split across chunks.
+                    longest = max(map(len, open_tokens))
+                    self._pos = max(self._pos, len(partial_content) - longest + 1)
+                    return tool_calls
+
+                idx, token = min(starts)
+                self._block_start = self._pos = idx + len(token)
+                self._close_token = open_tokens[token]
+
+            end = partial_content.find(self._close_token, self._pos)
+            if end == -1:
+                self._pos = max(
+                    self._pos, len(partial_content) - len(self._close_token) + 1
+                )
+                return tool_calls
+
+            if self._close_token == prompter.eot_token:
+                func_json_str = partial_content[self._block_start : end]
+                tool_calls.append(
+                    (
+                        self._func_idx,
+                        prompter.parse_tool_call(func_json_str, self._func_idx),
+                    )
+                )
+                self._func_idx += 1
+
+            self._pos = end + len(self._close_token)
+            self._close_token = None
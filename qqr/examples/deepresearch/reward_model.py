@@ -179,6 +179,31 @@ async def group_reward(args: Namespace, group: list[list[Sample]], **kwargs):
             sample.reward = group_rewards[idx]
 
 
+async def streaming_group_reward(
+    args: Namespace, group: list[Sample], tasks: list[asyncio.Task], **kwargs
+):
+    if len(group) <= 1:
+        raise ValueError("group size must be greater than 1")
+
+    if isinstance(group[0].prompt, str):
+        query = group[0].prompt
+    else:
+        query = group[0].prompt[-1]["content"]
+
+    async def get_prediction(task: asyncio.Task) -> list[dict]:
+        samples = await task
+        return samples[-1].messages
+
+    predictions = [get_prediction(task) for task in tasks]
+    group_rewards = await group_reward_model.compute_streaming(
+        predictions=predictions, query=query
+    )
+
+    for idx, task in enumerate(tasks):
+        for sample in task.result():
+            sample.reward = group_rewards[idx]
+
+
 def reward_post_process(args: Namespace, samples: list[Sample] | list[list[Sample]]):
     raw_rewards = [sample.get_reward_value(args) for sample in samples]
     return raw_rewards, raw_rewards
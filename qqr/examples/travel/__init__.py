@@ -1,8 +1,9 @@
-from .reward_model import group_reward, reward_post_process
+from .reward_model import group_reward, reward_post_process, streaming_group_reward
 from .rollout import generate
 
 __all__ = [
     "generate",
     "group_reward",
     "reward_post_process",
+    "streaming_group_reward",
 ]
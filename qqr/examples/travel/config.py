@@ -10,6 +10,9 @@ from qqr.utils.envs import (
 __all__ = [
     "group_reward_model_name",
     "max_steps",
+    "incremental_tokenization",
+    "single_sample_per_trajectory",
+    "streaming_tool_dispatch",
     "llm_judge_api_key",
     "llm_judge_base_url",
     "llm_judge_model",
@@ -89,6 +92,17 @@ def mcp_server_config_fn() -> list[MCPServer]:
 
 max_steps = 5
 
+# Carry tokens across steps and only encode the newly appended messages.
+# The step status is appended as a system message instead of rewriting the first one.
+incremental_tokenization = False
+
+# Emit one sample per trajectory with a loss mask over the assistant spans,
+# instead of one sample per step. Requires `incremental_tokenization`.
+single_sample_per_trajectory = False
+
+# Stream the generation and call each tool as soon as its <tool_call> block is complete.
+streaming_tool_dispatch = False
+
 
 # Select topology:
 # - anchor
@@ -218,4 +232,5 @@ llm_judge_system_prompt = """你是一名深谙旅游行业、具有严谨逻辑
 - poi_search工具用于在一个指定的城市内搜索兴趣点（POI）的地理空间信息。
 - around_search工具通过设置圆心和半径，搜索圆形区域内的地点信息。
 - web_search工具用于执行通用的、开放知识搜索。
+- route_matrix工具一次计算多个地点之间各段路线的距离和耗时，与多次调用direction工具等价，但不包含详细的导航步骤。
 - direction工具除了起始点、终点经纬度，还可以设置waypoints途经点。因此针对多点路线导航，既可以通过多次调用不带waypoints的direction工具来完成规划，也可以通过调用单次带waypoints的direction工具来完成规划。因此评估应关注整条路线每个点是否都被覆盖到，在都覆盖了的前提下，再看路线信息的完整性，路线的合理性"""
@@ -13,6 +13,9 @@ from qqr.utils.envs import (
 __all__ = [
     "group_reward_model_name",
     "max_steps",
+    "incremental_tokenization",
+    "single_sample_per_trajectory",
+    "streaming_tool_dispatch",
     "llm_judge_api_key",
     "llm_judge_base_url",
     "llm_judge_model",
@@ -91,6 +94,17 @@ def mcp_server_config_fn() -> list[MCPServer]:
 
 max_steps = 5
 
+# Carry tokens across steps and only encode the newly appended messages.
+# The step status is appended as a system message instead of rewriting the first one.
+incremental_tokenization = False
+
+# Emit one sample per trajectory with a loss mask over the assistant spans,
+# instead of one sample per step. Requires `incremental_tokenization`.
+single_sample_per_trajectory = False
+
+# Stream the generation and call each tool as soon as its <tool_call> block is complete.
+streaming_tool_dispatch = False
+
 
 # Select topology:
 # - anchor
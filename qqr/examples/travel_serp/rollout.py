@@ -5,12 +5,16 @@ Tools: Google Maps, Google Flights, Google Search (all via SerpApi)
 import asyncio
 import logging
 from argparse import Namespace
-from copy import deepcopy
 from datetime import datetime
 from typing import Any
 
 from qqr.data.prompts.qwen3 import Qwen3Prompt
-from qqr.rollout.agent_rollout import GenerateState, MCPState
+from qqr.rollout.agent_rollout import (
+    GenerateState,
+    MCPState,
+    StreamingToolDispatcher,
+    merge_trajectory,
+)
 from qqr.rollout.agent_rollout import generate as base_generate
 from qqr.schemas import Sample
 
@@ -31,7 +35,7 @@ async def generate(
     if isinstance(sample.prompt, str):
         sample.messages = [{"role": "user", "content": sample.prompt}]
     else:
-        sample.messages = deepcopy(sample.prompt)
+        sample.messages = list(sample.prompt)
 
     samples = await agent_loop(args, sample, sampling_params)
 
@@ -66,6 +70,10 @@ async def agent_loop(
     mcp_state = MCPState(config.mcp_server_config_fn)
     prompter = Qwen3Prompt()
 
+    assert (
+        config.incremental_tokenization or not config.single_sample_per_trajectory
+    ), "`single_sample_per_trajectory` requires `incremental_tokenization`."
+
     if sample.messages[0]["role"] != "system":
         sample.messages.insert(0, build_system_message(0, max_steps))
     samples = []
@@ -75,7 +83,7 @@ async def agent_loop(
             Sample(
                 group_index=sample.group_index,
                 index=sample.index,
-                messages=deepcopy(sample.messages),
+                messages=list(sample.messages),
                 prompt=sample.prompt,
                 label=sample.label,
                 status=Sample.Status.PENDING,
@@ -83,9 +91,26 @@ async def agent_loop(
                 train_metadata={"tools": mcp_state.tools},
             )
         )
+        if config.incremental_tokenization and step_idx > 0:
+            samples[-1].tokens = sample.tokens
+            samples[-1].num_tokenized_messages = sample.num_tokenized_messages
+            samples[-1].messages.append(build_system_message(step_idx, max_steps))
+        else:
+            samples[-1].messages[0] = build_system_message(step_idx, max_steps)
         sample = samples[-1]
-        sample.messages[0] = build_system_message(step_idx, max_steps)
-        sample = await base_generate(args, sample, sampling_params)
+        dispatcher = (
+            StreamingToolDispatcher(mcp_state, prompter)
+            if config.streaming_tool_dispatch
+            else None
+        )
+        try:
+            sample = await base_generate(
+                args, sample, sampling_params, on_text=dispatcher
+            )
+        except BaseException:
+            if dispatcher is not None:
+                await dispatcher.aclose()
+            raise
 
         sample.messages.append(
             {
@@ -93,13 +118,18 @@ async def agent_loop(
                 "content": sample.response.removesuffix(state.tokenizer.eos_token),
             }
         )
+        sample.num_tokenized_messages = len(sample.messages)
         sample.response_message = prompter.parse_assistant_content(sample.response)
         tool_calls = sample.response_message.get("tool_calls") or []
 
+        if dispatcher is not None:
+            tool_call_tasks = dispatcher.collect(tool_calls)
+        else:
+            tool_call_tasks = [mcp_state.call_tool(t) for t in tool_calls]
+
         if not tool_calls:
             break
 
-        tool_call_tasks = [mcp_state.call_tool(t) for t in tool_calls]
         tool_responses = await asyncio.gather(*tool_call_tasks)
         sample.messages.extend(tool_responses)
 
@@ -108,16 +138,25 @@ async def agent_loop(
             Sample(
                 group_index=sample.group_index,
                 index=sample.index,
-                messages=deepcopy(sample.messages),
+                messages=list(sample.messages),
                 prompt=sample.prompt,
                 label=sample.label,
                 status=Sample.Status.PENDING,
                 metadata=sample.metadata,
-                train_metadata=None,
+                train_metadata=(
+                    {"tools": mcp_state.tools}
+                    if config.incremental_tokenization
+                    else None
+                ),
             )
         )
+        if config.incremental_tokenization:
+            samples[-1].tokens = sample.tokens
+            samples[-1].num_tokenized_messages = sample.num_tokenized_messages
+            samples[-1].messages.append(build_system_message(max_steps, max_steps))
+        else:
+            samples[-1].messages[0] = build_system_message(max_steps, max_steps)
         sample = samples[-1]
-        sample.messages[0] = build_system_message(max_steps, max_steps)
         sample = await base_generate(args, sample, sampling_params)
         sample.messages.append(
             {
@@ -132,6 +171,9 @@ async def agent_loop(
         if message["role"] == "assistant":
             sample.messages[i] = prompter.parse_assistant_content(message["content"])
 
+    if config.single_sample_per_trajectory:
+        return [merge_trajectory(args, samples)]
+
     # Temporary padding to avoid trimming
     padding_num = (max_steps + 1) - len(samples)
     if padding_num > 0:
@@ -5,14 +5,41 @@ try:
         MCPServerStdioParams,
     )
 
-    from .server import MCPServerStdioCacheable
+    from .cache import (
+        CompressedToolResultCache,
+        ErrorClassifier,
+        MemoryToolResultCache,
+        SQLiteToolResultCache,
+        ToolResultCache,
+    )
+    from .limiter import AdaptiveLimiter
+    from .replay import MCPServerReplay, ToolCallRecorder
+    from .server import (
+        MCPServerInProcess,
+        MCPServerInProcessCacheable,
+        MCPServerStdioCacheable,
+        MCPServerStdioPool,
+        MCPServerStdioPoolCacheable,
+    )
 except ImportError:
     pass
 
 
 __all__ = [
+    "AdaptiveLimiter",
+    "CompressedToolResultCache",
+    "ErrorClassifier",
     "MCPServer",
+    "MCPServerInProcess",
+    "MCPServerInProcessCacheable",
+    "MCPServerReplay",
     "MCPServerStdio",
     "MCPServerStdioCacheable",
     "MCPServerStdioParams",
+    "MCPServerStdioPool",
+    "MCPServerStdioPoolCacheable",
+    "MemoryToolResultCache",
+    "SQLiteToolResultCache",
+    "ToolCallRecorder",
+    "ToolResultCache",
 ]
@@ -0,0 +1,254 @@
+import asyncio
+import logging
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+from cachetools import TTLCache
+from mcp.types import CallToolResult
+
+logger = logging.getLogger(__name__)
+
+# Errors that depend only on the arguments, so repeating the call returns the same error.
+DETERMINISTIC_ERROR_PATTERNS = [
+    r"No POI data available",
+    r"No route available",
+    r"No forecast data available",
+    r"City not found",
+    r"两地无航班信息",
+    r"两地无直达火车票",
+    r"INVALID_PARAMS|MISSING_REQUIRED_PARAMS|ILLEGAL_REQUEST",
+    r"validation error",
+]
+
+# Errors caused by the upstream service or the network, which are worth retrying.
+TRANSIENT_ERROR_PATTERNS = [
+    r"time(d)?[ -]?out",
+    r"\b429\b|rate limit|too many requests|QPS|EXCEEDED_THE_LIMIT",
+    r"\b5\d\d\b|server error|service unavailable|bad gateway",
+    r"connect(ion)?\s*(error|reset|refused|closed)",
+]
+
+
+class ErrorClassifier:
+    """
+    Decides whether an error result is deterministic, i.e. safe to cache negatively.
+
+    An error is deterministic if its text matches a deterministic pattern and no transient
+    pattern. Errors matching neither are treated as transient.
+    """
+
+    def __init__(
+        self,
+        deterministic_patterns: list[str] = DETERMINISTIC_ERROR_PATTERNS,
+        transient_patterns: list[str] = TRANSIENT_ERROR_PATTERNS,
+    ):
+        self.deterministic_pattern = re.compile("|".join(deterministic_patterns), re.I)
+        self.transient_pattern = re.compile("|".join(transient_patterns), re.I)
+
+    def __call__(self, result: CallToolResult) -> bool:
+        if not result.isError:
+            return False
+
+        text = self.get_text(result)
+        if self.transient_pattern.search(text):
+            return False
+        return bool(self.deterministic_pattern.search(text))
+
+    def is_transient(self, result: CallToolResult) -> bool:
+        """
+        Whether the result is an error that signals throttling or an upstream failure.
+        """
+        return result.isError and bool(
+            self.transient_pattern.search(self.get_text(result))
+        )
+
+    @staticmethod
+    def get_text(result: CallToolResult) -> str:
+        return " ".join(getattr(item, "text", "") for item in result.content)
+
+
+class ToolResultCache(ABC):
+    """
+    Storage backend for cached tool results, keyed by `MCPServerCacheableMixin._make_cache_key`.
+
+    Backends that serialize results must keep their `_meta` (dump with `by_alias=True`),
+    which holds the rendered tool message content.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> CallToolResult | None: ...
+
+    @abstractmethod
+    async def set(self, key: str, result: CallToolResult) -> None: ...
+
+
+class MemoryToolResultCache(ToolResultCache):
+    """
+    In-process cache, private to a single server instance.
+    """
+
+    def __init__(self, maxsize: int = 8192, ttl: int = 600):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, key: str) -> CallToolResult | None:
+        return self._cache.get(key)
+
+    async def set(self, key: str, result: CallToolResult) -> None:
+        self._cache[key] = result
+
+
+class CompressedToolResultCache(ToolResultCache):
+    """
+    In-process cache that stores results as compressed JSON and is bounded by the total
+    compressed size rather than the number of entries.
+    """
+
+    def __init__(
+        self, max_bytes: int = 256 * 1024 * 1024, ttl: int = 600, level: int = 6
+    ):
+        self._cache = TTLCache(maxsize=max_bytes, ttl=ttl, getsizeof=len)
+        self.level = level
+
+    @property
+    def currsize(self) -> int:
+        return self._cache.currsize
+
+    async def get(self, key: str) -> CallToolResult | None:
+        value = self._cache.get(key)
+        if value is None:
+            return None
+        return CallToolResult.model_validate_json(zlib.decompress(value))
+
+    async def set(self, key: str, result: CallToolResult) -> None:
+        value = zlib.compress(
+            result.model_dump_json(by_alias=True).encode("utf-8"), self.level
+        )
+        # Results larger than the whole budget are not cached.
+        if len(value) <= self._cache.maxsize:
+            self._cache[key] = value
+
+
+class SQLiteToolResultCache(ToolResultCache):
+    """
+    On-disk cache that can be shared by several processes on one host.
+
+    Entries live in a single SQLite file (in WAL mode) and are partitioned by `namespace`,
+    usually the server name, so several servers can share one file. Each namespace holds at
+    most `maxsize` entries; the ones closest to expiry are evicted first.
+    """
+
+    prune_interval = 256
+
+    def __init__(
+        self,
+        path: str | Path,
+        namespace: str = "",
+        maxsize: int = 8192,
+        ttl: int = 600,
+        warm_start_path: str | Path | None = None,
+    ):
+        """
+        Args:
+            path: Path to the SQLite file. Created if it does not exist.
+            namespace: Partition of the file used by this cache.
+            maxsize: Maximum number of entries kept in the namespace.
+            ttl: Time-to-live for entries in seconds.
+            warm_start_path: Cache file of a previous run to import unexpired entries from.
+        """
+        self.path = Path(path)
+        self.namespace = namespace
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            self.path, timeout=30, check_same_thread=False, isolation_level=None
+        )
+        self._lock = threading.Lock()
+        self._num_sets = 0
+
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS tool_results ("
+                "namespace TEXT NOT NULL, "
+                "key TEXT NOT NULL, "
+                "value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, "
+                "PRIMARY KEY (namespace, key))"
+            )
+
+        if warm_start_path is not None:
+            self.warm_start(warm_start_path)
+
+    def warm_start(self, path: str | Path) -> None:
+        """
+        Imports the unexpired entries of this namespace from another cache file.
+        """
+        path = Path(path)
+        if not path.exists() or path.resolve() == self.path.resolve():
+            return
+
+        with self._lock:
+            self._conn.execute("ATTACH DATABASE ? AS warm", (str(path),))
+            try:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO tool_results "
+                    "SELECT namespace, key, value, expires_at FROM warm.tool_results "
+                    "WHERE namespace = ? AND expires_at > ?",
+                    (self.namespace, time.time()),
+                )
+                logger.info(
+                    f"[{self.namespace}] Imported {cursor.rowcount} cached tool results from {path}"
+                )
+            finally:
+                self._conn.execute("DETACH DATABASE warm")
+        self._prune()
+
+    def _get(self, key: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM tool_results "
+                "WHERE namespace = ? AND key = ? AND expires_at > ?",
+                (self.namespace, key, time.time()),
+            ).fetchone()
+        return row[0] if row else None
+
+    def _set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tool_results VALUES (?, ?, ?, ?)",
+                (self.namespace, key, value, time.time() + self.ttl),
+            )
+            self._num_sets += 1
+            prune = self._num_sets % self.prune_interval == 0
+        if prune:
+            self._prune()
+
+    def _prune(self) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM tool_results WHERE namespace = ? AND expires_at <= ?",
+                (self.namespace, time.time()),
+            )
+            self._conn.execute(
+                "DELETE FROM tool_results WHERE namespace = ? AND key NOT IN ("
+                "SELECT key FROM tool_results WHERE namespace = ? "
+                "ORDER BY expires_at DESC LIMIT ?)",
+                (self.namespace, self.namespace, self.maxsize),
+            )
+
+    async def get(self, key: str) -> CallToolResult | None:
+        value = await asyncio.to_thread(self._get, key)
+        if value is None:
+            return None
+        return CallToolResult.model_validate_json(value)
+
+    async def set(self, key: str, result: CallToolResult) -> None:
+        await asyncio.to_thread(self._set, key, result.model_dump_json(by_alias=True))
@@ -0,0 +1,79 @@
+import re
+import unicodedata
+from typing import Any
+
+_whitespace_pattern = re.compile(r"\s+")
+# Strings made only of numbers and separators, e.g. "lng,lat" or "lng,lat|lng,lat".
+_numeric_list_pattern = re.compile(
+    r"^\s*-?\d+(?:\.\d+)?(?:\s*[,;|]\s*-?\d+(?:\.\d+)?)*\s*$"
+)
+# Only decimals are rounded, so integer codes such as "010" keep their leading zeros.
+_decimal_pattern = re.compile(r"-?\d+\.\d+")
+
+
+def format_number(value: float, precision: int) -> str:
+    return repr(round(float(value), precision)).removesuffix(".0")
+
+
+def canonicalize_value(value: Any, schema: dict | None, precision: int) -> Any:
+    schema = schema or {}
+
+    if isinstance(value, dict):
+        return canonicalize_object(value, schema, precision)
+
+    if isinstance(value, list):
+        return [
+            canonicalize_value(item, schema.get("items"), precision) for item in value
+        ]
+
+    if isinstance(value, bool):
+        return value
+
+    if isinstance(value, float):
+        value = round(value, precision)
+        return int(value) if value.is_integer() else value
+
+    if isinstance(value, str):
+        value = unicodedata.normalize("NFKC", value)
+        value = _whitespace_pattern.sub(" ", value).strip()
+        if _numeric_list_pattern.match(value):
+            value = _decimal_pattern.sub(
+                lambda m: format_number(m.group(0), precision), value
+            )
+            value = re.sub(r"\s*([,;|])\s*", r"\1", value)
+        return value
+
+    return value
+
+
+def canonicalize_object(value: dict, schema: dict, precision: int) -> dict:
+    properties = schema.get("properties") or {}
+    required = set(schema.get("required") or [])
+
+    result = {}
+    for key, prop_schema in properties.items():
+        if key not in value and "default" in prop_schema:
+            result[key] = prop_schema["default"]
+
+    result.update(value)
+
+    # An explicit null for an optional argument is the same call as omitting it.
+    result = {
+        k: canonicalize_value(v, properties.get(k), precision)
+        for k, v in result.items()
+        if not (v is None and k not in required)
+    }
+    return result
+
+
+def canonicalize_arguments(
+    arguments: dict | None, input_schema: dict | None = None, precision: int = 6
+) -> dict:
+    """
+    Canonicalizes tool call arguments against the tool's `inputSchema` for cache keys.
+
+    Fills in schema defaults, drops optional nulls, rounds decimals (including those in
+    strings such as "lng,lat" coordinates) to `precision` places, and applies NFKC
+    normalization and whitespace collapsing to strings.
+    """
+    return canonicalize_object(arguments or {}, input_schema or {}, precision)
@@ -0,0 +1,111 @@
+import asyncio
+import math
+import time
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limiter for calls to an upstream API.
+
+    The limit grows by `increase` per limit's worth of successful calls and is multiplied by
+    `decrease` on throttling, transient errors, or when the smoothed latency of a tool exceeds
+    `latency_tolerance` times the best latency observed for that tool. Latencies are tracked
+    per tool, so slow tools are not compared with fast ones on the same server. Decreases
+    happen at most once per smoothed latency, so a burst of failures from one congestion
+    event only backs off once.
+
+    Used as an async context manager like `asyncio.Semaphore`. Exceptions raised inside count
+    as congestion; call `record` to report the outcome of calls that returned.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        latency_tolerance: float = 3.0,
+    ):
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+
+        self.inflight = 0
+        self.waiting = 0
+        self.baseline_latency: dict[str, float] = {}
+        self.smoothed_latency: dict[str, float] = {}
+        self._last_decrease = 0.0
+        self._condition: asyncio.Condition | None = None
+
+    @property
+    def limit(self) -> int:
+        return max(self.min_limit, math.floor(self._limit))
+
+    @property
+    def condition(self) -> asyncio.Condition:
+        """
+        Lazy-initialized condition that binds to the current running Event Loop.
+        """
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    def reset_loop(self):
+        self._condition = None
+        self.inflight = 0
+        self.waiting = 0
+
+    async def __aenter__(self):
+        async with self.condition:
+            self.waiting += 1
+            try:
+                await self.condition.wait_for(lambda: self.inflight < self.limit)
+            finally:
+                self.waiting -= 1
+            self.inflight += 1
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is not None and not issubclass(exc_type, asyncio.CancelledError):
+            self.on_congestion()
+
+        async with self.condition:
+            self.inflight -= 1
+            self.condition.notify_all()
+
+    def record(self, latency: float, congested: bool = False, key: str = ""):
+        """
+        Reports the latency of a call to the tool `key` that returned, and whether the
+        upstream signalled congestion (throttling or a transient error).
+        """
+        if key not in self.baseline_latency:
+            self.baseline_latency[key] = self.smoothed_latency[key] = latency
+        else:
+            # Track the best latency seen recently, slowly forgetting older minimums.
+            self.baseline_latency[key] = min(latency, self.baseline_latency[key] * 1.01)
+            self.smoothed_latency[key] = (
+                0.9 * self.smoothed_latency[key] + 0.1 * latency
+            )
+
+        if (
+            congested
+            or self.smoothed_latency[key]
+            > self.baseline_latency[key] * self.latency_tolerance
+        ):
+            self.on_congestion(key)
+        else:
+            self._limit = min(self._limit + self.increase / self._limit, self.max_limit)
+
+    def on_congestion(self, key: str | None = None):
+        now = time.monotonic()
+        if key in self.smoothed_latency:
+            window = self.smoothed_latency[key]
+        else:
+            window = max(self.smoothed_latency.values(), default=0.0)
+        if now - self._last_decrease < window:
+            return
+        self._last_decrease = now
+        self._limit = max(self._limit * self.decrease, self.min_limit)
@@ -0,0 +1,183 @@
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Any
+
+from agents.exceptions import UserError
+from agents.mcp.server import MCPServer
+from mcp.types import (
+    CallToolResult,
+    GetPromptResult,
+    ListPromptsResult,
+    TextContent,
+)
+from mcp.types import Tool as MCPTool
+from openai.types.chat.chat_completion_tool_param import ChatCompletionToolParam
+
+from .canonical import canonicalize_arguments
+
+logger = logging.getLogger(__name__)
+
+
+def make_replay_key(
+    tool_name: str, arguments: dict[str, Any] | None, input_schema: dict | None = None
+) -> str:
+    arguments = canonicalize_arguments(arguments, input_schema)
+    return f"{tool_name}:{json.dumps(arguments, sort_keys=True, ensure_ascii=False)}"
+
+
+class ToolCallRecorder:
+    """
+    Appends the tool lists of MCP servers and every tool call with its result and latency to
+    a JSONL archive, which `MCPServerReplay` serves offline. Records are written in a worker
+    thread, off the event loop.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def _write(self, line: str):
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    async def write(self, record: dict):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        await asyncio.to_thread(self._write, line)
+
+    async def record_tools(
+        self, server_name: str, tools: list[ChatCompletionToolParam]
+    ):
+        await self.write({"type": "tools", "server": server_name, "tools": tools})
+
+    async def record_call(
+        self,
+        server_name: str,
+        tool_name: str,
+        arguments: dict[str, Any] | None,
+        key: str,
+        result: CallToolResult,
+        latency: float,
+    ):
+        await self.write(
+            {
+                "type": "call",
+                "server": server_name,
+                "tool": tool_name,
+                "arguments": arguments,
+                "key": key,
+                "result": result.model_dump(mode="json", by_alias=True),
+                "latency": latency,
+            }
+        )
+
+
+class MCPServerReplay(MCPServer):
+    """
+    Serves the tool calls recorded by `ToolCallRecorder` without a subprocess or network.
+
+    Calls are matched by tool name and canonicalized arguments. Repeated calls with the same
+    key return the recorded results in order, then keep returning the last one.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        tools: list[ChatCompletionToolParam],
+        calls: list[dict],
+        add_latency: bool = False,
+    ):
+        super().__init__()
+
+        self._name = name
+        self.tools = tools
+        self.add_latency = add_latency
+
+        self._schemas = {
+            tool["function"]["name"]: tool["function"].get("parameters")
+            for tool in tools
+        }
+        self._records: dict[str, deque[dict]] = defaultdict(deque)
+        for call in calls:
+            self._records[call["key"]].append(call)
+
+    @classmethod
+    def from_archive(
+        cls, path: str | Path, add_latency: bool = False
+    ) -> list["MCPServerReplay"]:
+        tools = {}
+        calls = defaultdict(list)
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                if record["type"] == "tools":
+                    tools[record["server"]] = record["tools"]
+                elif record["type"] == "call":
+                    calls[record["server"]].append(record)
+
+        logger.info(
+            f"Loaded {sum(len(c) for c in calls.values())} recorded tool calls "
+            f"of {len(tools)} MCP servers from {path}"
+        )
+        return [
+            cls(name, server_tools, calls[name], add_latency=add_latency)
+            for name, server_tools in tools.items()
+        ]
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    async def connect(self):
+        pass
+
+    async def cleanup(self):
+        pass
+
+    async def list_tools(self, *args, **kwargs) -> list[MCPTool]:
+        return [
+            MCPTool(
+                name=tool["function"]["name"],
+                description=tool["function"].get("description"),
+                inputSchema=tool["function"].get("parameters") or {},
+            )
+            for tool in self.tools
+        ]
+
+    async def call_tool(
+        self, tool_name: str, arguments: dict[str, Any] | None
+    ) -> CallToolResult:
+        key = make_replay_key(tool_name, arguments, self._schemas.get(tool_name))
+        records = self._records.get(key)
+        if not records:
+            return CallToolResult(
+                content=[
+                    TextContent(
+                        type="text",
+                        text=f"[Replay] No recorded result for {tool_name} with {arguments}",
+                    )
+                ],
+                isError=True,
+            )
+
+        record = records.popleft() if len(records) > 1 else records[0]
+        if self.add_latency:
+            await asyncio.sleep(record["latency"])
+        return CallToolResult.model_validate(record["result"])
+
+    async def list_prompts(self) -> ListPromptsResult:
+        return ListPromptsResult(prompts=[])
+
+    async def get_prompt(
+        self, name: str, arguments: dict[str, Any] | None = None
+    ) -> GetPromptResult:
+        raise UserError(
+            f"MCP server {self.name} is replayed from a tool call archive, which does not "
+            "record prompts."
+        )
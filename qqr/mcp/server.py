@@ -1,15 +1,45 @@
 import asyncio
 import hashlib
+import importlib
 import json
 import logging
-from typing import Any
+import os
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import Any, Callable
 
-from agents.mcp.server import MCPServerStdio
-from cachetools import TTLCache
-from mcp.types import CallToolResult
+import anyio
+from agents.mcp.server import (
+    MCPServer,
+    MCPServerStdio,
+    MCPServerStdioParams,
+    _MCPServerWithClientSession,
+)
+from agents.mcp.util import ToolFilter
+from mcp.server.fastmcp import FastMCP
+from mcp.shared.memory import create_client_server_memory_streams
+from mcp.types import CallToolResult, GetPromptResult, ListPromptsResult
+from mcp.types import Tool as MCPTool
+
+from qqr.utils.envs import MCP_CACHE_DIR, MCP_CACHE_WARM_START
+
+from .cache import (
+    CompressedToolResultCache,
+    ErrorClassifier,
+    MemoryToolResultCache,
+    SQLiteToolResultCache,
+    ToolResultCache,
+)
+from .canonical import canonicalize_arguments
+from .limiter import AdaptiveLimiter
 
 logger = logging.getLogger(__name__)
 
+# Prefix of the keys of the rendered tool message content in the `meta` of cached results,
+# followed by the render mode.
+RENDERED_META_KEY = "qqr/rendered"
+
 
 class MCPServerCacheableMixin:
     """
@@ -21,7 +51,15 @@ class MCPServerCacheableMixin:
         blocklist: set[str] | None = None,
         cache_ttl: int = 600,
         cache_maxsize: int = 8192,
+        cache_max_bytes: int | None = None,
         concurrency_limit: int = 64,
+        adaptive_concurrency: bool = False,
+        max_concurrency_limit: int | None = None,
+        cache: ToolResultCache | None = None,
+        cache_key_normalizers: dict[str, Callable[[dict], dict]] | None = None,
+        cache_key_precision: int = 6,
+        negative_cache_ttl: int = 60,
+        error_classifier: ErrorClassifier | None = None,
         *args,
         **kwargs,
     ):
@@ -32,19 +70,83 @@ class MCPServerCacheableMixin:
             blocklist: A set of tool names to exclude from caching (e.g., {"send_email", "write_file"}).
             cache_ttl: Time-to-live for cache items in seconds. Defaults to 600.
             cache_maxsize: Maximum number of items to store in the cache. Defaults to 8192.
+            cache_max_bytes: If set, the in-process cache stores compressed results and is bounded
+                by their total size in bytes instead of `cache_maxsize`.
             concurrency_limit: Max concurrent tool calls allowed for this server. Defaults to 64.
+            adaptive_concurrency: Adapt the concurrency limit to the upstream API with AIMD, starting
+                from `concurrency_limit`. Defaults to False.
+            max_concurrency_limit: Upper bound of the adaptive limit. Defaults to 4x `concurrency_limit`.
+            cache: Backend for cached results. Defaults to an on-disk cache shared by all processes
+                if `MCP_CACHE_DIR` is set, otherwise to an in-process cache.
+            cache_key_normalizers: Per-tool hooks applied to the canonicalized arguments before
+                building the cache key (e.g., {"poi_search": lambda args: {**args, "region": ""}}).
+            cache_key_precision: Decimal places kept for numbers in cache keys. Defaults to 6.
+            negative_cache_ttl: Time-to-live in seconds for cached deterministic errors. 0 disables
+                negative caching. Defaults to 60.
+            error_classifier: Classifies error results: deterministic errors may be cached and
+                transient ones lower the adaptive concurrency limit. Defaults to `ErrorClassifier()`.
             *args, **kwargs: Arguments passed to the underlying MCPServer implementation.
         """
         super().__init__(*args, **kwargs)
 
-        self._tool_cache = TTLCache(maxsize=cache_maxsize, ttl=cache_ttl)
+        self._tool_cache = cache or self._make_cache(
+            self.name, maxsize=cache_maxsize, ttl=cache_ttl, max_bytes=cache_max_bytes
+        )
+        self._negative_cache = (
+            self._make_cache(
+                f"{self.name}:errors",
+                maxsize=cache_maxsize,
+                ttl=negative_cache_ttl,
+                max_bytes=cache_max_bytes,
+            )
+            if negative_cache_ttl > 0
+            else None
+        )
+        self._error_classifier = error_classifier or ErrorClassifier()
         self._cache_blocklist = blocklist or set()
+        self._cache_key_normalizers = cache_key_normalizers or {}
+        self._cache_key_precision = cache_key_precision
+        # Tool input schemas, recorded by `list_tools`, used to canonicalize cache keys.
+        self._tool_schemas: dict[str, dict] = {}
+
+        # In-flight calls by cache key, so that identical concurrent calls run only once.
+        self._inflight_calls: dict[str, asyncio.Future] = {}
+        self.cache_stats = Counter()
 
         self.concurrency_limit = concurrency_limit
         self._semaphore: asyncio.Semaphore | None = None
+        self.limiter = (
+            AdaptiveLimiter(
+                initial_limit=concurrency_limit,
+                max_limit=max_concurrency_limit or 4 * concurrency_limit,
+            )
+            if adaptive_concurrency
+            else None
+        )
+
+    @staticmethod
+    def _make_cache(
+        namespace: str, maxsize: int, ttl: int, max_bytes: int | None = None
+    ) -> ToolResultCache:
+        """
+        Creates the default cache backend: an on-disk cache shared by all processes if
+        `MCP_CACHE_DIR` is set, otherwise an in-process cache, compressed and bounded by
+        `max_bytes` if given.
+        """
+        if MCP_CACHE_DIR:
+            return SQLiteToolResultCache(
+                os.path.join(MCP_CACHE_DIR, "tool_results.sqlite"),
+                namespace=namespace,
+                maxsize=maxsize,
+                ttl=ttl,
+                warm_start_path=MCP_CACHE_WARM_START,
+            )
+        if max_bytes is not None:
+            return CompressedToolResultCache(max_bytes=max_bytes, ttl=ttl)
+        return MemoryToolResultCache(maxsize=maxsize, ttl=ttl)
 
     @property
-    def semaphore(self) -> asyncio.Semaphore:
+    def semaphore(self) -> asyncio.Semaphore | AdaptiveLimiter:
         """
         Lazy-initialized semaphore that binds to the current running Event Loop.
 
@@ -52,6 +154,8 @@ class MCPServerCacheableMixin:
         when the server instance persists across multiple asyncio.run() calls or
         event loop restarts.
         """
+        if self.limiter is not None:
+            return self.limiter
         if self._semaphore is None:
             self._semaphore = asyncio.Semaphore(self.concurrency_limit)
         return self._semaphore
@@ -63,6 +167,14 @@ class MCPServerCacheableMixin:
         if arguments is None:
             return tool_name
 
+        arguments = canonicalize_arguments(
+            arguments,
+            self._tool_schemas.get(tool_name),
+            precision=self._cache_key_precision,
+        )
+        if tool_name in self._cache_key_normalizers:
+            arguments = self._cache_key_normalizers[tool_name](arguments)
+
         # Serialize arguments to a JSON string with sorted keys for consistency.
         # ensure_ascii=False ensures logs are readable for non-ASCII characters.
         args_str = json.dumps(arguments, sort_keys=True, ensure_ascii=False)
@@ -75,38 +187,170 @@ class MCPServerCacheableMixin:
 
         return full_key
 
+    async def list_tools(self, *args, **kwargs) -> list[MCPTool]:
+        tools = await super().list_tools(*args, **kwargs)
+        for tool in tools:
+            self._tool_schemas[tool.name] = tool.inputSchema
+        return tools
+
+    def set_tool_schemas(self, schemas: dict[str, dict]):
+        """
+        Sets the tool input schemas when the tools are known without calling `list_tools`.
+        """
+        self._tool_schemas.update(schemas)
+
     async def call_tool(
         self, tool_name: str, arguments: dict[str, Any] | None
     ) -> CallToolResult:
         """
         Intercepts the tool call to check the cache before executing.
         """
+        return await self._call_tool(tool_name, arguments)
+
+    async def _call_tool(
+        self,
+        tool_name: str,
+        arguments: dict[str, Any] | None,
+        render: Callable[[CallToolResult], str] | None = None,
+        render_mode: str = "default",
+    ) -> CallToolResult:
+        """
+        Calls the tool through the cache. If `render` is given, successful results are stored
+        with their rendered content in `meta`, see `call_tool_rendered`.
+        """
         if tool_name in self._cache_blocklist:
             async with self.semaphore:
                 return await super().call_tool(tool_name, arguments)
 
         cache_key = self._make_cache_key(tool_name, arguments)
-        if cache_key in self._tool_cache:
-            return self._tool_cache[cache_key]
+        while True:
+            cached = await self._tool_cache.get(cache_key)
+            if cached is not None:
+                self.cache_stats["hits"] += 1
+                return cached
+
+            if self._negative_cache is not None:
+                cached = await self._negative_cache.get(cache_key)
+                if cached is not None:
+                    self.cache_stats["negative_hits"] += 1
+                    return cached
 
-        async with self.semaphore:
-            if cache_key in self._tool_cache:
-                return self._tool_cache[cache_key]
+            inflight = self._inflight_calls.get(cache_key)
+            if inflight is None:
+                break
 
-            result: CallToolResult = await super().call_tool(tool_name, arguments)
+            self.cache_stats["coalesced"] += 1
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # Retry if the call we joined was cancelled rather than ourselves.
+                if not inflight.cancelled():
+                    raise
+                self.cache_stats["coalesced"] -= 1
 
-            # Store only successful results
-            if not result.isError:
-                self._tool_cache[cache_key] = result
+        self.cache_stats["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        # Mark exceptions as retrieved when no identical call joined.
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight_calls[cache_key] = future
+
+        try:
+            async with self.semaphore:
+                start = time.perf_counter()
+                result: CallToolResult = await super().call_tool(tool_name, arguments)
+                if self.limiter is not None:
+                    self.limiter.record(
+                        time.perf_counter() - start,
+                        congested=self._error_classifier.is_transient(result),
+                        key=tool_name,
+                    )
+
+                # Store successful results, and deterministic errors in the negative cache
+                if not result.isError:
+                    if render is not None:
+                        meta = dict(result.meta or {})
+                        meta[f"{RENDERED_META_KEY}/{render_mode}"] = render(result)
+                        result = result.model_copy(update={"meta": meta})
+                    await self._tool_cache.set(cache_key, result)
+                elif self._negative_cache is not None and self._error_classifier(
+                    result
+                ):
+                    await self._negative_cache.set(cache_key, result)
+
+            future.set_result(result)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._inflight_calls.pop(cache_key, None)
 
         return result
 
+    async def call_tool_rendered(
+        self,
+        tool_name: str,
+        arguments: dict[str, Any] | None,
+        render: Callable[[CallToolResult], str],
+        render_mode: str = "default",
+    ) -> str:
+        """
+        Calls the tool and returns `render(result)`. The rendered content of successful results
+        is stored in the same cache entry as the result, so hits skip rendering without a
+        second cache.
+
+        `render_mode` names the output format of `render` and is part of the stored key, since
+        on-disk cache entries are shared by processes and runs that may render differently.
+        Entries rendered in another mode are rendered again.
+        """
+        result = await self._call_tool(
+            tool_name, arguments, render=render, render_mode=render_mode
+        )
+        rendered = (result.meta or {}).get(f"{RENDERED_META_KEY}/{render_mode}")
+        return rendered if rendered is not None else render(result)
+
+    def collect_limiter_metrics(
+        self, prefix: str = "rollout/mcp_limiter"
+    ) -> dict[str, float]:
+        """
+        Returns the current adaptive concurrency limit, in-flight calls and queue depth.
+        """
+        if self.limiter is None:
+            return {}
+        return {
+            f"{prefix}/{self.name}/limit": self.limiter.limit,
+            f"{prefix}/{self.name}/inflight": self.limiter.inflight,
+            f"{prefix}/{self.name}/queue_depth": self.limiter.waiting,
+        }
+
+    def collect_cache_metrics(
+        self, prefix: str = "rollout/mcp_cache"
+    ) -> dict[str, int]:
+        """
+        Returns and resets the cache hit, negative hit, miss and coalesced call counts.
+        """
+        metrics = {
+            f"{prefix}/{self.name}/{k}": self.cache_stats[k]
+            for k in ("hits", "negative_hits", "misses", "coalesced")
+        }
+        total = sum(self.cache_stats.values())
+        metrics[f"{prefix}/{self.name}/hit_rate"] = (
+            (total - self.cache_stats["misses"]) / total if total else 0.0
+        )
+        self.cache_stats.clear()
+        return metrics
+
     async def cleanup(self):
         """
         Override cleanup to reset the semaphore for future event loops.
         """
         await super().cleanup()
         self._semaphore = None
+        if self.limiter is not None:
+            self.limiter.reset_loop()
+        self._inflight_calls.clear()
 
 
 class MCPServerStdioCacheable(MCPServerCacheableMixin, MCPServerStdio):
@@ -115,3 +359,166 @@ class MCPServerStdioCacheable(MCPServerCacheableMixin, MCPServerStdio):
     """
 
     pass
+
+
+class MCPServerStdioPool(MCPServer):
+    """
+    A pool of identical stdio MCP server replicas behind a single server interface.
+
+    Every replica runs the same command. Tool calls go to the replica with the fewest
+    outstanding requests, and the tool list is taken from the first replica.
+    """
+
+    def __init__(
+        self,
+        params: MCPServerStdioParams,
+        num_replicas: int = 2,
+        name: str | None = None,
+        use_structured_content: bool = False,
+        **kwargs,
+    ):
+        """
+        Args:
+            params: Parameters of the stdio server command shared by all replicas.
+            num_replicas: Number of server processes to spawn. Defaults to 2.
+            name: A readable name for the pool. Replicas are named `<name>/<idx>`.
+            **kwargs: Arguments passed to each `MCPServerStdio` replica.
+        """
+        super().__init__(use_structured_content=use_structured_content)
+
+        self._name = name or f"stdio_pool: {params['command']}"
+        self.replicas = [
+            MCPServerStdio(
+                params=params,
+                name=f"{self._name}/{idx}",
+                use_structured_content=use_structured_content,
+                **kwargs,
+            )
+            for idx in range(num_replicas)
+        ]
+        self._outstanding = [0] * num_replicas
+
+    @property
+    def params(self):
+        return self.replicas[0].params
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    # Replicas are connected in the calling task and cleaned up in reverse order, since the
+    # stdio clients' cancel scopes must be exited in the task and order they were entered.
+    async def connect(self):
+        for replica in self.replicas:
+            await replica.connect()
+
+    async def cleanup(self):
+        for replica in reversed(self.replicas):
+            await replica.cleanup()
+
+    async def list_tools(self, *args, **kwargs) -> list[MCPTool]:
+        return await self.replicas[0].list_tools(*args, **kwargs)
+
+    async def call_tool(
+        self, tool_name: str, arguments: dict[str, Any] | None
+    ) -> CallToolResult:
+        idx = min(range(len(self.replicas)), key=self._outstanding.__getitem__)
+        self._outstanding[idx] += 1
+        try:
+            return await self.replicas[idx].call_tool(tool_name, arguments)
+        finally:
+            self._outstanding[idx] -= 1
+
+    async def list_prompts(self) -> ListPromptsResult:
+        return await self.replicas[0].list_prompts()
+
+    async def get_prompt(
+        self, name: str, arguments: dict[str, Any] | None = None
+    ) -> GetPromptResult:
+        return await self.replicas[0].get_prompt(name, arguments)
+
+
+class MCPServerStdioPoolCacheable(MCPServerCacheableMixin, MCPServerStdioPool):
+    """
+    Cached and Rate-Limited version of MCPServerStdioPool. The cache and `concurrency_limit`
+    are shared by all replicas.
+    """
+
+    pass
+
+
+class MCPServerInProcess(_MCPServerWithClientSession):
+    """
+    Runs a `FastMCP` server inside the current process, connected over in-memory streams.
+
+    Tool calls skip the subprocess, the stdio pipe and the JSON encoding of messages, while
+    the server still validates arguments and reports errors as it does over stdio. The
+    server shares the event loop and environment variables of the rollout process.
+    """
+
+    def __init__(
+        self,
+        server: FastMCP | str,
+        cache_tools_list: bool = False,
+        name: str | None = None,
+        client_session_timeout_seconds: float | None = 5,
+        tool_filter: ToolFilter = None,
+        use_structured_content: bool = False,
+        max_retry_attempts: int = 0,
+        retry_backoff_seconds_base: float = 1.0,
+    ):
+        """
+        Args:
+            server: A `FastMCP` instance, or the name of a module exposing one as `mcp`
+                (e.g., "qqr.tools.amap", the module run by `python -m qqr.tools.amap`).
+            name: A readable name for the server. Defaults to the name of the `FastMCP` server.
+            Other arguments are the same as for `MCPServerStdio`.
+        """
+        super().__init__(
+            cache_tools_list,
+            client_session_timeout_seconds,
+            tool_filter,
+            use_structured_content,
+            max_retry_attempts,
+            retry_backoff_seconds_base,
+        )
+
+        if isinstance(server, str):
+            server = importlib.import_module(server).mcp
+        self.server = server
+
+        self._name = name or f"in_process: {server.name}"
+
+    @asynccontextmanager
+    async def create_streams(self):
+        """
+        Starts the server on one end of a pair of memory streams and yields the other end.
+        """
+        # FastMCP only exposes the low-level server used by its transports privately.
+        server = self.server._mcp_server
+        async with create_client_server_memory_streams() as (
+            client_streams,
+            server_streams,
+        ):
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(
+                    lambda: server.run(
+                        *server_streams, server.create_initialization_options()
+                    )
+                )
+                try:
+                    yield *client_streams, None
+                finally:
+                    tg.cancel_scope.cancel()
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+
+class MCPServerInProcessCacheable(MCPServerCacheableMixin, MCPServerInProcess):
+    """
+    Cached and Rate-Limited version of MCPServerInProcess.
+    """
+
+    pass
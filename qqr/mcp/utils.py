@@ -1,3 +1,10 @@
+import hashlib
+import importlib.metadata
+import importlib.util
+import json
+import os
+from pathlib import Path
+
 from agents.mcp import MCPServer, MCPUtil
 from agents.models.chatcmpl_converter import Converter
 from mcp.types import Tool as MCPTool
@@ -24,3 +31,70 @@ async def get_mcp_tools(mcp_server: MCPServer) -> list[ChatCompletionToolParam]:
     converted_tools = [Converter.tool_to_openai(tool) for tool in server_tools]
 
     return converted_tools
+
+
+def get_server_fingerprint(mcp_server: MCPServer) -> str | None:
+    """
+    Identifies the tools a stdio server exposes by its name, command, the qqr version and,
+    for `python -m <module>` commands, the source of the module's package.
+
+    Returns None for servers that can not be fingerprinted.
+    """
+    params = getattr(mcp_server, "params", None)
+    if params is None:
+        return None
+
+    try:
+        qqr_version = importlib.metadata.version("qqr")
+    except importlib.metadata.PackageNotFoundError:
+        qqr_version = None
+
+    h = hashlib.sha256()
+    h.update(
+        json.dumps(
+            [mcp_server.name, params.command, params.args, qqr_version],
+            ensure_ascii=False,
+        ).encode("utf-8")
+    )
+
+    args = list(params.args)
+    if "-m" in args and args.index("-m") + 1 < len(args):
+        module = args[args.index("-m") + 1]
+        try:
+            spec = importlib.util.find_spec(module)
+        except (ImportError, ValueError):
+            spec = None
+        if spec is not None and spec.origin is not None:
+            for path in sorted(Path(spec.origin).parent.rglob("*.py")):
+                h.update(path.read_bytes())
+
+    return h.hexdigest()
+
+
+class ToolCatalog:
+    """
+    Converted tool lists of MCP servers persisted in a JSON file, keyed by server fingerprint,
+    so that restarts can skip `list_tools`.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+
+    def load(self) -> dict[str, list[ChatCompletionToolParam]]:
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def get(self, fingerprint: str) -> list[ChatCompletionToolParam] | None:
+        return self.load().get(fingerprint)
+
+    def set(self, fingerprint: str, tools: list[ChatCompletionToolParam]) -> None:
+        catalog = self.load()
+        catalog[fingerprint] = tools
+
+        # Write atomically, since several processes may share the file.
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(catalog, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, self.path)
@@ -1,4 +1,5 @@
 import asyncio
+from collections.abc import Awaitable
 
 import numpy as np
 import pandas as pd
@@ -20,18 +21,46 @@ class AnchorBasedRankingGroupRewardModel(GroupRewardModel):
 
         pivot_idx = 0
         pivot_prediction = predictions[pivot_idx]
-        pivot_scores = [5.0] * group_size
-        other_scores = [5.0] * group_size
         tasks = []
         async with asyncio.TaskGroup() as tg:
             for idx in range(1, group_size):
                 task = tg.create_task(
-                    self.llm_judge.bidirectional_compare(
+                    self.bidirectional_compare(
                         predictions[idx], pivot_prediction, query=query, idx=idx
                     )
                 )
                 tasks.append(task)
 
+        scores = self.get_scores(tasks, group_size)
+        return self.calculate_group_rewards(scores, group_size)
+
+    async def compute_streaming(
+        self, predictions: list[Awaitable[list[dict]]], query: str
+    ) -> list[float]:
+        """Compares each trajectory with the pivot as soon as both have finished."""
+        group_size = len(predictions)
+        predictions = [asyncio.ensure_future(p) for p in predictions]
+
+        pivot_idx = 0
+
+        async def compare_with_pivot(idx: int) -> tuple[float, float, dict]:
+            pivot_prediction = await predictions[pivot_idx]
+            prediction = await predictions[idx]
+            return await self.bidirectional_compare(
+                prediction, pivot_prediction, query=query, idx=idx
+            )
+
+        tasks = []
+        async with asyncio.TaskGroup() as tg:
+            for idx in range(1, group_size):
+                tasks.append(tg.create_task(compare_with_pivot(idx)))
+
+        scores = self.get_scores(tasks, group_size)
+        return self.calculate_group_rewards(scores, group_size)
+
+    def get_scores(self, tasks: list[asyncio.Task], group_size: int) -> list[float]:
+        pivot_scores = [5.0] * group_size
+        other_scores = [5.0] * group_size
         for task in tasks:
             other_score, pivot_score, metadata = task.result()
             idx = metadata["idx"]
@@ -40,7 +69,11 @@ class AnchorBasedRankingGroupRewardModel(GroupRewardModel):
 
         pivot_scores = pivot_scores[1:]
         pivot_mean_score = np.mean(pivot_scores)
-        scores = [pivot_mean_score] + other_scores[1:]
+        return [pivot_mean_score] + other_scores[1:]
+
+    def calculate_group_rewards(
+        self, scores: list[float], group_size: int
+    ) -> list[float]:
         ranks = pd.Series(scores).rank(method="min", ascending=False).tolist()
         max_rank = max(ranks)
 
@@ -58,7 +58,7 @@ class DoubleEliminationGroupRewardModel(GroupRewardModel):
         async with asyncio.TaskGroup() as tg:
             tasks = [
                 tg.create_task(
-                    self.llm_judge.bidirectional_compare(
+                    self.bidirectional_compare(
                         predictions[p1.idx],
                         predictions[p2.idx],
                         query=query,
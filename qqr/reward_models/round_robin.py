@@ -1,5 +1,6 @@
 import asyncio
 import itertools
+from collections.abc import Awaitable
 
 import pandas as pd
 import torch
@@ -18,18 +19,45 @@ class RoundRobinGroupRewardModel(GroupRewardModel):
     async def compute(self, predictions: list[list[dict]], query: str) -> list[float]:
         group_size = len(predictions)
 
-        wins = [0.0] * group_size
         pairs = list(itertools.combinations(range(group_size), 2))
         tasks = []
         async with asyncio.TaskGroup() as tg:
             for i, j in pairs:
                 task = tg.create_task(
-                    self.llm_judge.bidirectional_compare(
+                    self.bidirectional_compare(
                         predictions[i], predictions[j], query=query, i=i, j=j
                     )
                 )
                 tasks.append(task)
 
+        wins = self.count_wins(tasks, group_size)
+        return self.calculate_group_rewards(wins, group_size)
+
+    async def compute_streaming(
+        self, predictions: list[Awaitable[list[dict]]], query: str
+    ) -> list[float]:
+        """Plays each match as soon as both of its trajectories have finished."""
+        group_size = len(predictions)
+        predictions = [asyncio.ensure_future(p) for p in predictions]
+
+        async def play_match(i: int, j: int) -> tuple[float, float, dict]:
+            prediction_i = await predictions[i]
+            prediction_j = await predictions[j]
+            return await self.bidirectional_compare(
+                prediction_i, prediction_j, query=query, i=i, j=j
+            )
+
+        pairs = list(itertools.combinations(range(group_size), 2))
+        tasks = []
+        async with asyncio.TaskGroup() as tg:
+            for i, j in pairs:
+                tasks.append(tg.create_task(play_match(i, j)))
+
+        wins = self.count_wins(tasks, group_size)
+        return self.calculate_group_rewards(wins, group_size)
+
+    def count_wins(self, tasks: list[asyncio.Task], group_size: int) -> list[float]:
+        wins = [0.0] * group_size
         for task in tasks:
             score_i, score_j, metadata = task.result()
             i, j = metadata["i"], metadata["j"]
@@ -42,6 +70,11 @@ class RoundRobinGroupRewardModel(GroupRewardModel):
                 wins[i] += 0.5
                 wins[j] += 0.5
 
+        return wins
+
+    def calculate_group_rewards(
+        self, wins: list[float], group_size: int
+    ) -> list[float]:
         ranks = pd.Series(wins).rank(method="min", ascending=False).tolist()
         max_rank = max(ranks)
 
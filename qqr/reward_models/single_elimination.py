@@ -57,7 +57,7 @@ class SingleEliminationGroupRewardModel(GroupRewardModel):
         async with asyncio.TaskGroup() as tg:
             for idx in range(1, group_size):
                 task = tg.create_task(
-                    self.llm_judge.bidirectional_compare(
+                    self.bidirectional_compare(
                         predictions[idx], pivot_prediction, query=query, idx=idx
                     )
                 )
@@ -99,7 +99,7 @@ class SingleEliminationGroupRewardModel(GroupRewardModel):
                 for p1, p2 in pairings:
                     tasks.append(
                         tg.create_task(
-                            self.llm_judge.bidirectional_compare(
+                            self.bidirectional_compare(
                                 predictions[p1.idx],
                                 predictions[p2.idx],
                                 query=query,
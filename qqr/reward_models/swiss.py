@@ -1,6 +1,7 @@
 import asyncio
 import math
 import random
+from collections.abc import Awaitable
 from dataclasses import dataclass, field
 
 import torch
@@ -19,11 +20,17 @@ class Player:
 
 @registers.reward_model("swiss")
 class SwissSystemGroupRewardModel(GroupRewardModel):
-    def __init__(self, llm_judge: LLMJudge, max_num_rounds: int | None = None):
+    def __init__(
+        self,
+        llm_judge: LLMJudge,
+        max_num_rounds: int | None = None,
+        streaming_window: int = 4,
+    ):
         super().__init__()
 
         self.llm_judge = llm_judge
         self.max_num_rounds = max_num_rounds
+        self.streaming_window = max(streaming_window, 2)
 
     async def compute(self, predictions: list[list[dict]], query: str) -> list[float]:
         group_size = len(predictions)
@@ -31,40 +38,125 @@ class SwissSystemGroupRewardModel(GroupRewardModel):
         num_rounds = self.get_num_rounds(group_size)
         players = [Player(idx=i) for i in range(group_size)]
         for _ in range(num_rounds):
-            pairings, bye_player_idx = self.create_pairings(players)
-
-            tasks = []
-            async with asyncio.TaskGroup() as tg:
-                for i, j in pairings:
-                    task = tg.create_task(
-                        self.llm_judge.bidirectional_compare(
-                            predictions[i], predictions[j], query=query, i=i, j=j
-                        )
-                    )
-                    tasks.append(task)
+            await self.play_round(players, predictions, query=query)
 
-            for task in tasks:
-                score_i, score_j, metadata = task.result()
-                i, j = metadata["i"], metadata["j"]
-                if score_i > score_j:
-                    players[i].points += 1.0
-                elif score_j > score_i:
-                    players[j].points += 1.0
-                else:
-                    players[i].points += 0.5
-                    players[j].points += 0.5
+        self.calculate_buchholz(players)
+        group_rewards = self.calculate_group_rewards(players, group_size)
+
+        return group_rewards
 
-                players[i].opponents.add(j)
-                players[j].opponents.add(i)
+    async def compute_streaming(
+        self, predictions: list[Awaitable[list[dict]]], query: str
+    ) -> list[float]:
+        """
+        Plays the first round as trajectories finish, then the remaining rounds as usual.
+
+        First-round pairs are drawn at random among the last `streaming_window` finished
+        trajectories rather than across the whole group, so trajectories with similar
+        generation time, e.g. short answers, are more likely to meet. A larger window
+        reduces this bias at the cost of starting comparisons later; a window of the group
+        size waits for all trajectories and matches the random pairing of `compute`. The
+        bye is drawn at random.
+        """
+        group_size = len(predictions)
+        predictions = [asyncio.ensure_future(p) for p in predictions]
+
+        num_rounds = self.get_num_rounds(group_size)
+        players = [Player(idx=i) for i in range(group_size)]
+        if num_rounds > 0:
+            await self.play_first_round_streaming(players, predictions, query=query)
 
-            if bye_player_idx is not None:
-                players[bye_player_idx].points += 1.0
+        predictions = await asyncio.gather(*predictions)
+        for _ in range(num_rounds - 1):
+            await self.play_round(players, predictions, query=query)
 
         self.calculate_buchholz(players)
         group_rewards = self.calculate_group_rewards(players, group_size)
 
         return group_rewards
 
+    async def play_round(
+        self, players: list[Player], predictions: list[list[dict]], query: str
+    ):
+        pairings, bye_player_idx = self.create_pairings(players)
+
+        tasks = []
+        async with asyncio.TaskGroup() as tg:
+            for i, j in pairings:
+                task = tg.create_task(
+                    self.bidirectional_compare(
+                        predictions[i], predictions[j], query=query, i=i, j=j
+                    )
+                )
+                tasks.append(task)
+
+        self.record_results(players, tasks, bye_player_idx)
+
+    async def play_first_round_streaming(
+        self, players: list[Player], predictions: list[asyncio.Future], query: str
+    ):
+        bye_player_idx = None
+        waiting = list(range(len(players)))
+        if len(waiting) % 2 != 0:
+            bye_player_idx = waiting.pop(random.randrange(len(waiting)))
+
+        async def wait_for(idx: int) -> int:
+            await predictions[idx]
+            return idx
+
+        tasks = []
+        async with asyncio.TaskGroup() as tg:
+
+            def play(i: int, j: int):
+                task = tg.create_task(
+                    self.bidirectional_compare(
+                        predictions[i].result(),
+                        predictions[j].result(),
+                        query=query,
+                        i=i,
+                        j=j,
+                    )
+                )
+                tasks.append(task)
+
+            finished = []
+            for next_finished in asyncio.as_completed(
+                [wait_for(idx) for idx in waiting]
+            ):
+                finished.append(await next_finished)
+                if len(finished) >= self.streaming_window:
+                    random.shuffle(finished)
+                    play(finished.pop(), finished.pop())
+
+            random.shuffle(finished)
+            while finished:
+                play(finished.pop(), finished.pop())
+
+        self.record_results(players, tasks, bye_player_idx)
+
+    def record_results(
+        self,
+        players: list[Player],
+        tasks: list[asyncio.Task],
+        bye_player_idx: int | None,
+    ):
+        for task in tasks:
+            score_i, score_j, metadata = task.result()
+            i, j = metadata["i"], metadata["j"]
+            if score_i > score_j:
+                players[i].points += 1.0
+            elif score_j > score_i:
+                players[j].points += 1.0
+            else:
+                players[i].points += 0.5
+                players[j].points += 0.5
+
+            players[i].opponents.add(j)
+            players[j].opponents.add(i)
+
+        if bye_player_idx is not None:
+            players[bye_player_idx].points += 1.0
+
     def get_num_rounds(self, group_size: int) -> int:
         if self.max_num_rounds is not None and self.max_num_rounds > 0:
             num_rounds = self.max_num_rounds
@@ -75,8 +167,10 @@ class SwissSystemGroupRewardModel(GroupRewardModel):
         return num_rounds
 
     def create_pairings(self, players: list[Player]) -> tuple[list, int | None]:
-        random.shuffle(players)
-        players_sorted = sorted(players, key=lambda p: p.points, reverse=True)
+        # Shuffle a copy: `players` stays indexed by player idx.
+        shuffled = players[:]
+        random.shuffle(shuffled)
+        players_sorted = sorted(shuffled, key=lambda p: p.points, reverse=True)
 
         unpaired = players_sorted[:]
         pairings = []
@@ -1,17 +1,23 @@
 import asyncio
-import copy
 import inspect
 import json
 import logging
+import math
+import os
+import threading
+import time
 from argparse import Namespace
-from collections.abc import Callable
-from contextlib import contextmanager
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import aclosing, contextmanager
 from copy import deepcopy
+from pathlib import Path
 from typing import Any
 
+import httpx
 import numpy as np
 import pybase64
 import sglang_router
+from mcp.types import CallToolResult, TextContent
 from packaging.version import parse
 from slime.rollout.base_types import RolloutFnEvalOutput, RolloutFnTrainOutput
 from slime.rollout.filter_hub.base_types import MetricGatherer, call_dynamic_filter
@@ -28,15 +34,138 @@ from slime.utils.processing_utils import (
 )
 from tqdm.auto import tqdm
 
+from qqr.data.prompts.qwen3 import Qwen3Prompt
 from qqr.mcp import MCPServer
-from qqr.mcp.utils import get_mcp_tools
+from qqr.mcp.replay import MCPServerReplay, ToolCallRecorder, make_replay_key
+from qqr.mcp.utils import ToolCatalog, get_mcp_tools, get_server_fingerprint
 from qqr.schemas import Sample
+from qqr.utils.envs import (
+    COMPACT_TOOL_MESSAGES,
+    DP_GROUP_AFFINITY,
+    EVAL_CONCURRENCY,
+    EVAL_OUTPUT_DIR,
+    INCREMENTAL_TOKENIZATION_CHECK,
+    LOOP_MONITOR,
+    MAX_INFLIGHT_TRAJECTORIES,
+    MCP_CACHE_DIR,
+    MCP_RECORD_PATH,
+    MCP_REPLAY_LATENCY,
+    MCP_REPLAY_PATH,
+    STREAMING_GROUP_RM_PATH,
+    TRAJECTORY_OVERSUBSCRIPTION,
+)
+from qqr.utils.loop_monitor import loop_monitor
+from qqr.utils.timing import stage_timer
 
 __all__ = ["generate_rollout"]
 
 logger = logging.getLogger(__name__)
 
 
+class DPRouter:
+    """
+    Routes generation requests to SGLang data-parallel ranks.
+
+    All turns of a trajectory (or all trajectories of a group, with `group_affinity`) are
+    pinned to one rank so their shared prefix stays in that rank's KV cache. New trajectories
+    go to the rank with the fewest in-flight tokens.
+    """
+
+    def __init__(self, dp_size: int, group_affinity: bool = False) -> None:
+        self.dp_size = dp_size
+        self.group_affinity = group_affinity
+
+        self.inflight_tokens = [0] * dp_size
+        self._pins: dict[tuple, int] = {}
+        self._pin_refs: dict[tuple, int] = {}
+
+        self.reset_metrics()
+
+    def reset_metrics(self) -> None:
+        self.affinity_hits = 0
+        self.affinity_misses = 0
+        self.routed_requests = [0] * self.dp_size
+        self.routed_tokens = [0] * self.dp_size
+        self.peak_inflight_tokens = [0] * self.dp_size
+
+    def _affinity_key(self, sample: Sample) -> tuple:
+        if self.group_affinity and sample.group_index is not None:
+            return ("group", sample.group_index)
+        return ("sample", sample.index)
+
+    @contextmanager
+    def trajectory(self, sample: Sample):
+        """
+        Keep the pin of a trajectory alive across its turns, tool calls included.
+        """
+        key = self._affinity_key(sample)
+        self._pin_refs[key] = self._pin_refs.get(key, 0) + 1
+        try:
+            yield
+        finally:
+            self._pin_refs[key] -= 1
+            if self._pin_refs[key] == 0:
+                del self._pin_refs[key]
+                self._pins.pop(key, None)
+
+    @contextmanager
+    def route(self, sample: Sample, num_tokens: int):
+        """
+        Select a DP rank for one generation request and account its tokens while in flight.
+        Yields None when there is nothing to route.
+        """
+        if self.dp_size <= 1:
+            yield None
+            return
+
+        key = self._affinity_key(sample)
+        dp_rank = self._pins.get(key)
+        if dp_rank is not None:
+            self.affinity_hits += 1
+        else:
+            self.affinity_misses += 1
+            min_tokens = min(self.inflight_tokens)
+            candidates = [
+                i
+                for i, tokens in enumerate(self.inflight_tokens)
+                if tokens == min_tokens
+            ]
+            dp_rank = int(np.random.choice(candidates))
+            if key in self._pin_refs:
+                self._pins[key] = dp_rank
+
+        self.inflight_tokens[dp_rank] += num_tokens
+        self.routed_requests[dp_rank] += 1
+        self.routed_tokens[dp_rank] += num_tokens
+        self.peak_inflight_tokens[dp_rank] = max(
+            self.peak_inflight_tokens[dp_rank], self.inflight_tokens[dp_rank]
+        )
+        try:
+            yield dp_rank
+        finally:
+            self.inflight_tokens[dp_rank] -= num_tokens
+            assert self.inflight_tokens[dp_rank] >= 0
+
+    def collect(self) -> dict[str, float]:
+        if self.dp_size <= 1:
+            return {}
+
+        total = self.affinity_hits + self.affinity_misses
+        metrics = {
+            "rollout/router/affinity_hit_rate": (
+                self.affinity_hits / total if total else 0.0
+            ),
+        }
+        for dp_rank in range(self.dp_size):
+            prefix = f"rollout/router/dp_{dp_rank}"
+            metrics[f"{prefix}/requests"] = self.routed_requests[dp_rank]
+            metrics[f"{prefix}/tokens"] = self.routed_tokens[dp_rank]
+            metrics[f"{prefix}/peak_inflight_tokens"] = self.peak_inflight_tokens[
+                dp_rank
+            ]
+        return metrics
+
+
 class GenerateState(metaclass=SingletonMeta):
     """
     The global state for the generation process.
@@ -48,11 +177,18 @@ class GenerateState(metaclass=SingletonMeta):
         self.tokenizer = load_tokenizer(args.hf_checkpoint, trust_remote_code=True)
         self.processor = load_processor(args.hf_checkpoint, trust_remote_code=True)
 
-        self.semaphore = asyncio.Semaphore(
+        # `semaphore` only guards the /generate requests, while `trajectory_semaphore`
+        # limits the trajectories in flight, which may be waiting on tools or the judge.
+        concurrency = (
             args.sglang_server_concurrency
             * args.rollout_num_gpus
             // args.rollout_num_gpus_per_engine
         )
+        self.trajectory_concurrency = MAX_INFLIGHT_TRAJECTORIES or max(
+            concurrency, math.ceil(concurrency * TRAJECTORY_OVERSUBSCRIPTION)
+        )
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.trajectory_semaphore = asyncio.Semaphore(self.trajectory_concurrency)
         self.sampling_params: dict[str, Any] = dict(
             temperature=args.rollout_temperature,
             top_p=args.rollout_top_p,
@@ -72,30 +208,48 @@ class GenerateState(metaclass=SingletonMeta):
                 sampling_seed_base + i for i in range(args.n_samples_per_prompt)
             ]
 
-        # dp rank balancing
-        self.dp_counts = [0] * (args.sglang_dp_size or 1)
-        self.dp_rank = 0
+        # dp rank routing with prefix affinity
+        self.router = DPRouter(
+            args.sglang_dp_size or 1, group_affinity=DP_GROUP_AFFINITY
+        )
 
         self.reset()
 
-    @contextmanager
-    def dp_rank_context(self):
-        candidates = [
-            i for i, count in enumerate(self.dp_counts) if count == min(self.dp_counts)
-        ]
-        dp_rank = int(np.random.choice(candidates))
-        self.dp_counts[dp_rank] += 1
-        self.dp_rank = dp_rank
-        try:
-            yield dp_rank
-        finally:
-            self.dp_counts[dp_rank] -= 1
-            assert self.dp_counts[dp_rank] >= 0
+    def encode_new_messages(self, sample: Sample) -> list[int]:
+        """
+        Encode the messages appended after `sample.tokens`, ending with the generation prompt.
+
+        The new messages are rendered behind a placeholder user turn that is stripped afterwards,
+        so context-dependent parts of the chat template (e.g. grouped tool responses) come out
+        exactly as in a full render of `sample.messages`.
+        """
+        placeholder = [{"role": "user", "content": ""}]
+        prefix_text = self.tokenizer.apply_chat_template(placeholder, tokenize=False)
+        text = self.tokenizer.apply_chat_template(
+            placeholder + sample.messages[sample.num_tokenized_messages :],
+            tokenize=False,
+            add_generation_prompt=True,
+        )
+        assert text.startswith(prefix_text), "Chat template is not prefix-stable."
+        text = text[len(prefix_text) :]
+
+        # Close the previous assistant turn the same way the chat template does.
+        eos_token = self.tokenizer.eos_token
+        turn_separator = prefix_text[prefix_text.rindex(eos_token) + len(eos_token) :]
+        if sample.tokens[-1] != self.tokenizer.eos_token_id:
+            turn_separator = eos_token + turn_separator
+
+        return self.tokenizer.encode(turn_separator + text, add_special_tokens=False)
 
     def reset(self) -> None:
         self.remaining_batch_size = 0
         self.pendings = set()
         self.aborted = False
+        self.reset_metrics()
+
+    def reset_metrics(self) -> None:
+        self.router.reset_metrics()
+        stage_timer.reset()
 
     def submit_generate_tasks(self, samples: list[list[Sample]]) -> None:
         for group in samples:
@@ -113,12 +267,39 @@ class GenerateState(metaclass=SingletonMeta):
         self.remaining_batch_size += len(samples)
 
 
+def render_tool_result(result: CallToolResult) -> str:
+    """
+    Renders a tool result as the content of a tool message.
+    """
+    if COMPACT_TOOL_MESSAGES:
+        # A single text item is returned as is, without the JSON envelope.
+        if len(result.content) == 1 and isinstance(result.content[0], TextContent):
+            return result.content[0].text
+        tool_results = [
+            item.model_dump(mode="json", exclude_none=True) for item in result.content
+        ]
+        return json.dumps(tool_results, ensure_ascii=False)
+
+    if len(result.content) == 1:
+        return result.content[0].model_dump_json()
+    elif len(result.content) > 1:
+        tool_results = [item.model_dump(mode="json") for item in result.content]
+        return json.dumps(tool_results, ensure_ascii=False, indent=4)
+    else:
+        # Empty content is a valid result (e.g., "no results found")
+        return "[]"
+
+
 class MCPState(metaclass=SingletonMeta):
     """
     The global state for the MCP server.
     """
 
+    # The instance created by the rollout function, if any, for metrics collection.
+    current: "MCPState | None" = None
+
     def __init__(self, mcp_server_config_fn: callable) -> None:
+        MCPState.current = self
         self._mcp_server_config_fn = mcp_server_config_fn
 
         self._mcp_servers: list[MCPServer] = None
@@ -127,6 +308,14 @@ class MCPState(metaclass=SingletonMeta):
         self.tools = []
         self.tool_to_server: dict[str, MCPServer] = {}
 
+        self._tool_catalog = (
+            ToolCatalog(os.path.join(MCP_CACHE_DIR, "tool_catalog.json"))
+            if MCP_CACHE_DIR
+            else None
+        )
+        self._recorder = ToolCallRecorder(MCP_RECORD_PATH) if MCP_RECORD_PATH else None
+        self._tool_schemas: dict[str, dict] = {}
+
     async def get_mcp_servers(self) -> list[MCPServer]:
         """
         Thread-safe lazy initialization of the MCP server.
@@ -136,17 +325,31 @@ class MCPState(metaclass=SingletonMeta):
             async with self._mcp_lock:
                 if self._mcp_servers is None:
                     try:
-                        servers = self._mcp_server_config_fn()
+                        if MCP_REPLAY_PATH:
+                            servers = MCPServerReplay.from_archive(
+                                MCP_REPLAY_PATH, add_latency=MCP_REPLAY_LATENCY
+                            )
+                        else:
+                            servers = self._mcp_server_config_fn()
+                        # Servers are connected in the calling task, since the stdio and
+                        # in-process clients enter cancel scopes that must be exited in the
+                        # task that entered them. Only their tools are loaded concurrently.
                         for server in servers:
                             await server.connect()
-                            converted_tools = await get_mcp_tools(server)
-                            self.tools += converted_tools
-                            for tool in converted_tools:
-                                self.tool_to_server[tool["function"]["name"]] = server
-
                             logger.info(
                                 f"MCP Server {server.name} connected successfully."
                             )
+                        server_tools = await asyncio.gather(
+                            *[self.load_tools(server) for server in servers]
+                        )
+                        for server, converted_tools in zip(servers, server_tools):
+                            self.tools += converted_tools
+                            for tool in converted_tools:
+                                tool_name = tool["function"]["name"]
+                                self.tool_to_server[tool_name] = server
+                                self._tool_schemas[tool_name] = tool["function"].get(
+                                    "parameters"
+                                )
 
                         self._mcp_servers = servers
 
@@ -157,6 +360,61 @@ class MCPState(metaclass=SingletonMeta):
 
         return self._mcp_servers
 
+    async def load_tools(self, server: MCPServer) -> list[dict]:
+        """
+        Returns the converted tools of a connected server, taken from the persisted tool
+        catalog when the server is unchanged since they were listed.
+        """
+        if isinstance(server, MCPServerReplay):
+            return server.tools
+
+        fingerprint = get_server_fingerprint(server) if self._tool_catalog else None
+        converted_tools = (
+            self._tool_catalog.get(fingerprint) if fingerprint is not None else None
+        )
+        if converted_tools is None:
+            converted_tools = await get_mcp_tools(server)
+            if fingerprint is not None:
+                self._tool_catalog.set(fingerprint, converted_tools)
+        elif hasattr(server, "set_tool_schemas"):
+            server.set_tool_schemas(
+                {
+                    tool["function"]["name"]: tool["function"]["parameters"]
+                    for tool in converted_tools
+                }
+            )
+
+        if self._recorder is not None:
+            await self._recorder.record_tools(server.name, converted_tools)
+
+        return converted_tools
+
+    def collect(self) -> dict[str, int]:
+        metrics = {}
+        for server in self._mcp_servers or []:
+            if hasattr(server, "collect_cache_metrics"):
+                metrics.update(server.collect_cache_metrics())
+            if hasattr(server, "collect_limiter_metrics"):
+                metrics.update(server.collect_limiter_metrics())
+        return metrics
+
+    async def call_and_record_tool(
+        self, server: MCPServer, tool_name: str, tool_arguments: dict
+    ) -> str:
+        start = time.perf_counter()
+        result = await server.call_tool(tool_name, tool_arguments)
+        await self._recorder.record_call(
+            server.name,
+            tool_name,
+            tool_arguments,
+            key=make_replay_key(
+                tool_name, tool_arguments, self._tool_schemas.get(tool_name)
+            ),
+            result=result,
+            latency=time.perf_counter() - start,
+        )
+        return render_tool_result(result)
+
     async def call_tool(self, tool_call: dict) -> dict:
         await self.get_mcp_servers()
 
@@ -179,16 +437,21 @@ class MCPState(metaclass=SingletonMeta):
                 json.loads(tool_arguments_str) if tool_arguments_str else {}
             )
 
-            result = await target_server.call_tool(tool_name, tool_arguments)
-
-            if len(result.content) == 1:
-                tool_content = result.content[0].model_dump_json()
-            elif len(result.content) > 1:
-                tool_results = [item.model_dump(mode="json") for item in result.content]
-                tool_content = json.dumps(tool_results, ensure_ascii=False, indent=4)
-            else:
-                # Empty content is a valid result (e.g., "no results found")
-                tool_content = "[]"
+            with stage_timer.time(f"tool/{tool_name}"):
+                if self._recorder is not None:
+                    tool_content = await self.call_and_record_tool(
+                        target_server, tool_name, tool_arguments
+                    )
+                elif hasattr(target_server, "call_tool_rendered"):
+                    tool_content = await target_server.call_tool_rendered(
+                        tool_name,
+                        tool_arguments,
+                        render=render_tool_result,
+                        render_mode="compact" if COMPACT_TOOL_MESSAGES else "full",
+                    )
+                else:
+                    result = await target_server.call_tool(tool_name, tool_arguments)
+                    tool_content = render_tool_result(result)
         except json.JSONDecodeError as e:
             tool_content = f"[Error] Invalid JSON arguments: {e}"
         except Exception as e:
@@ -201,10 +464,119 @@ class MCPState(metaclass=SingletonMeta):
         }
 
 
+class StreamingToolDispatcher:
+    """
+    Dispatches tool calls as soon as their block is complete in the streamed response,
+    so that tool latency overlaps with the rest of the decode.
+    """
+
+    def __init__(self, mcp_state: MCPState, prompter: Qwen3Prompt) -> None:
+        self.mcp_state = mcp_state
+        self.prompter = prompter
+
+        self._scanner = prompter.tool_call_scanner()
+        self._dispatched: dict[str, tuple[dict, asyncio.Task]] = {}
+
+    def __call__(self, partial_response: str) -> None:
+        for _, tool_call in self._scanner.scan(partial_response):
+            if tool_call is not None:
+                task = asyncio.create_task(self.mcp_state.call_tool(tool_call))
+                self._dispatched[tool_call["id"]] = (tool_call, task)
+
+    def collect(self, tool_calls: list[dict]) -> list[Awaitable[dict]]:
+        """
+        Returns the tool responses of the final tool calls, reusing the dispatched calls that
+        still match and cancelling the rest.
+        """
+        tool_call_tasks = []
+        for tool_call in tool_calls:
+            dispatched_call, task = self._dispatched.pop(tool_call["id"], (None, None))
+            if dispatched_call == tool_call:
+                tool_call_tasks.append(task)
+            else:
+                if task is not None:
+                    task.cancel()
+                tool_call_tasks.append(self.mcp_state.call_tool(tool_call))
+
+        for _, task in self._dispatched.values():
+            task.cancel()
+        self._dispatched.clear()
+
+        return tool_call_tasks
+
+    async def aclose(self) -> None:
+        """
+        Cancels the dispatched tool calls that were not collected and waits for them to exit.
+        """
+        tasks = [task for _, task in self._dispatched.values()]
+        self._dispatched.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+_stream_client: httpx.AsyncClient | None = None
+
+
+async def post_stream(
+    url: str, payload: dict, max_retries: int = 60
+) -> AsyncIterator[dict]:
+    """
+    Streams the JSON chunks of a server-sent events response from SGLang.
+
+    Like slime's `post`, failed requests are retried every second up to `max_retries` times,
+    and a stream that ends without any chunk counts as a failure. Once a chunk has been
+    yielded the request is not retried, since the caller has already consumed its output.
+    """
+    global _stream_client
+    if _stream_client is None:
+        _stream_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=None), timeout=httpx.Timeout(None)
+        )
+
+    retry_count = 0
+    while True:
+        has_output = False
+        try:
+            async with _stream_client.stream("POST", url, json=payload) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:") :].strip()
+                    if data == "[DONE]":
+                        break
+                    output = json.loads(data)
+                    has_output = True
+                    yield output
+            if not has_output:
+                raise RuntimeError(f"Stream from {url} ended without output")
+            return
+        except Exception as e:
+            if has_output:
+                raise
+            retry_count += 1
+            logger.info(
+                f"Error: {e}, retrying... (attempt {retry_count}/{max_retries})"
+            )
+            if retry_count >= max_retries:
+                logger.info(f"Max retries ({max_retries}) reached, failing...")
+                raise
+            await asyncio.sleep(1)
+
+
 async def generate(
-    args: Namespace, sample: Sample, sampling_params: dict[str, Any]
+    args: Namespace,
+    sample: Sample,
+    sampling_params: dict[str, Any],
+    on_text: Callable[[str], None] | None = None,
 ) -> Sample:
-    """Generate using traditional SGLang router with token-based workflow"""
+    """
+    Generate using traditional SGLang router with token-based workflow.
+
+    If `on_text` is given, the response is streamed and `on_text` is called with the text
+    generated so far on every chunk.
+    """
     state = GenerateState(args)
     url = f"http://{args.sglang_router_ip}:{args.sglang_router_port}/generate"
 
@@ -213,20 +585,61 @@ async def generate(
     ), f"Sample status is {sample.status}"
 
     tools = sample.train_metadata.get("tools") if sample.train_metadata else None
-    prompt_text = state.tokenizer.apply_chat_template(
-        sample.messages, tools=tools, tokenize=False, add_generation_prompt=True
+
+    # Only encode the messages appended since the previous turn.
+    incremental = (
+        len(sample.response) == 0
+        and sample.num_tokenized_messages > 0
+        and len(sample.tokens) > 0
+        and not state.processor
     )
 
-    if state.processor:
-        processor_output = state.processor(text=prompt_text, **sample.multimodal_inputs)
-        prompt_ids = processor_output["input_ids"][0]
-        sample.multimodal_train_inputs = {
-            k: v
-            for k, v in processor_output.items()
-            if k not in ["input_ids", "attention_mask"]
-        } or None
-    else:
-        prompt_ids = state.tokenizer.encode(prompt_text, add_special_tokens=False)
+    with stage_timer.time("tokenize"):
+        if incremental:
+            prompt_ids = sample.tokens + state.encode_new_messages(sample)
+
+            if INCREMENTAL_TOKENIZATION_CHECK:
+                prompt_text = state.tokenizer.apply_chat_template(
+                    sample.messages,
+                    tools=tools,
+                    tokenize=False,
+                    add_generation_prompt=True,
+                )
+                full_prompt_ids = state.tokenizer.encode(
+                    prompt_text, add_special_tokens=False
+                )
+                if prompt_ids != full_prompt_ids:
+                    mismatch = next(
+                        (
+                            i
+                            for i, (a, b) in enumerate(zip(prompt_ids, full_prompt_ids))
+                            if a != b
+                        ),
+                        min(len(prompt_ids), len(full_prompt_ids)),
+                    )
+                    logger.warning(
+                        f"Incremental tokenization differs from full render at position {mismatch} "
+                        f"(incremental: {len(prompt_ids)} tokens, full: {len(full_prompt_ids)} tokens)"
+                    )
+
+        elif state.processor:
+            prompt_text = state.tokenizer.apply_chat_template(
+                sample.messages, tools=tools, tokenize=False, add_generation_prompt=True
+            )
+            processor_output = state.processor(
+                text=prompt_text, **sample.multimodal_inputs
+            )
+            prompt_ids = processor_output["input_ids"][0]
+            sample.multimodal_train_inputs = {
+                k: v
+                for k, v in processor_output.items()
+                if k not in ["input_ids", "attention_mask"]
+            } or None
+        else:
+            prompt_text = state.tokenizer.apply_chat_template(
+                sample.messages, tools=tools, tokenize=False, add_generation_prompt=True
+            )
+            prompt_ids = state.tokenizer.encode(prompt_text, add_special_tokens=False)
 
     current_sampling_params = deepcopy(sampling_params)
     current_sampling_params["max_new_tokens"] = min(
@@ -269,10 +682,34 @@ async def generate(
         payload["input_ids"] = sample.tokens
     else:
         payload["input_ids"] = prompt_ids
-        if not sample.tokens:  # Initialize sample.tokens for the first turn
+        # Initialize sample.tokens for the first turn, or extend it with the new messages
+        if not sample.tokens or incremental:
             sample.tokens = prompt_ids
 
-    output = await post(url, payload)
+    num_tokens = len(payload["input_ids"]) + current_sampling_params["max_new_tokens"]
+    async with stage_timer.acquire(state.semaphore, "wait/generate"):
+        if state.aborted:
+            sample.status = Sample.Status.ABORTED
+            return sample
+
+        with state.router.route(sample, num_tokens) as dp_rank:
+            if dp_rank is not None:
+                payload["data_parallel_rank"] = dp_rank
+            start = time.perf_counter()
+            if on_text is not None:
+                # SGLang streams the cumulative output, so the last chunk is the full response.
+                payload["stream"] = True
+                async with aclosing(post_stream(url, payload)) as stream:
+                    async for output in stream:
+                        on_text(output["text"])
+            else:
+                output = await post(url, payload)
+            latency = time.perf_counter() - start
+
+    stage_timer.record("generate", latency)
+    completion_tokens = output["meta_info"].get("completion_tokens")
+    if completion_tokens and latency > 0:
+        stage_timer.record("generate/tokens_per_second", completion_tokens / latency)
 
     if (
         args.use_slime_router
@@ -323,6 +760,46 @@ async def generate(
     return sample
 
 
+def merge_trajectory(args: Namespace, samples: list[Sample]) -> Sample:
+    """
+    Merge the per-step samples of an incrementally tokenized trajectory into a single sample.
+
+    Each step extends the tokens of the previous one, so the last step holds the whole
+    interleaved token stream. The loss mask is 1 on generated spans and 0 on the tool and
+    system tokens in between, where the rollout log probs are zero-filled.
+    """
+    state = GenerateState(args)
+
+    prompt_length = len(samples[0].tokens) - samples[0].response_length
+    prefix_length = prompt_length
+    loss_mask, rollout_log_probs = [], []
+
+    merged = samples[0]
+    for sample in samples:
+        observation_length = len(sample.tokens) - sample.response_length - prefix_length
+        # Stop at steps that did not extend the stream (e.g. truncated before generation)
+        if observation_length < 0:
+            break
+
+        loss_mask += [0] * observation_length + [1] * sample.response_length
+        rollout_log_probs += [0.0] * observation_length + (
+            sample.rollout_log_probs or [0.0] * sample.response_length
+        )
+        prefix_length = len(sample.tokens)
+        merged = sample
+
+    merged.response_length = prefix_length - prompt_length
+    merged.response = state.tokenizer.decode(merged.tokens[prompt_length:])
+    merged.loss_mask = loss_mask
+    merged.rollout_log_probs = rollout_log_probs
+
+    merged.messages = samples[-1].messages
+    merged.response_message = samples[-1].response_message
+    merged.status = samples[-1].status
+
+    return merged
+
+
 async def generate_and_rm(
     args: Namespace,
     sample: Sample | list[Sample],
@@ -350,12 +827,12 @@ async def generate_and_rm(
     state = GenerateState(args)
 
     # generate
-    async with state.semaphore:
+    async with stage_timer.acquire(state.trajectory_semaphore, "wait/trajectory"):
         if state.aborted:
             sample.status = Sample.Status.ABORTED
             return sample
 
-        with state.dp_rank_context() as _:
+        with state.router.trajectory(sample), stage_timer.time("trajectory"):
             # Check sample.generate_function_path for per-sample custom_generate_function_path (e.g., from eval dataset config)
             custom_func_path = (
                 getattr(sample, "generate_function_path", None)
@@ -425,7 +902,26 @@ async def generate_and_rm_group(
             )
         )
 
-    group = await asyncio.gather(*tasks)
+    rm_task = None
+    if STREAMING_GROUP_RM_PATH and args.group_rm and not evaluation:
+        streaming_group_rm = load_function(STREAMING_GROUP_RM_PATH)
+        rm_task = asyncio.create_task(streaming_group_rm(args, group, tasks))
+
+    try:
+        group = await asyncio.gather(*tasks)
+    except BaseException:
+        if rm_task is not None:
+            rm_task.cancel()
+            await asyncio.gather(rm_task, return_exceptions=True)
+        raise
+
+    if rm_task is not None:
+        if state.aborted:
+            rm_task.cancel()
+            await asyncio.gather(rm_task, return_exceptions=True)
+        else:
+            await rm_task
+        return group
 
     # for the rm that need the whole group, we will do the rm here
     if not state.aborted and args.group_rm:
@@ -501,6 +997,9 @@ async def generate_rollout_async(
 
     state = GenerateState(args)
 
+    if LOOP_MONITOR:
+        loop_monitor.start()
+
     # instantiate data filters
     dynamic_filter = (
         load_function(args.dynamic_sampling_filter_path)
@@ -524,9 +1023,9 @@ async def generate_rollout_async(
             # get samples from the buffer and submit the generation requests.
             samples = data_source(args.over_sampling_batch_size)
             if isinstance(samples[0], list):
-                samples = [[Sample(**_s.__dict__.copy()) for _s in s] for s in samples]
+                samples = [[Sample.from_sample(_s) for _s in s] for s in samples]
             else:
-                samples = [Sample(**s.__dict__.copy()) for s in samples]
+                samples = [Sample.from_sample(s) for s in samples]
             state.submit_generate_tasks(samples)
 
         # wait for the generation to finish
@@ -584,6 +1083,14 @@ async def generate_rollout_async(
         else group[0].index,
     )
 
+    metrics = metric_gatherer.collect()
+    metrics.update(state.router.collect())
+    metrics.update(stage_timer.collect())
+    if MCPState.current is not None:
+        metrics.update(MCPState.current.collect())
+    if LOOP_MONITOR:
+        metrics.update(loop_monitor.collect())
+
     # reset the global state to prevent effects on the next rollout or eval.
     state.reset()
     if args.rollout_sample_filter_path is not None:
@@ -595,9 +1102,7 @@ async def generate_rollout_async(
         process_func = load_function(args.rollout_all_samples_process_path)
         process_func(args, all_samples, data_source)
 
-    return RolloutFnTrainOutput(
-        samples=data, metrics=metric_gatherer.collect()
-    ), aborted_samples
+    return RolloutFnTrainOutput(samples=data, metrics=metrics), aborted_samples
 
 
 EVAL_PROMPT_DATASET = {}
@@ -606,10 +1111,17 @@ EVAL_PROMPT_DATASET = {}
 async def eval_rollout(
     args: Namespace, rollout_id: int
 ) -> tuple[dict[str, dict[str, list[Any]]], list[list[Sample]]]:
+    # Timing and routing metrics are only reported for train rollouts, so keep eval
+    # requests out of them.
+    state = GenerateState(args)
+    state.reset_metrics()
     coros = []
     for dataset_cfg in getattr(args, "eval_datasets", []) or []:
         coros.append(eval_rollout_single_dataset(args, rollout_id, dataset_cfg))
-    results_list = await asyncio.gather(*coros)
+    try:
+        results_list = await asyncio.gather(*coros)
+    finally:
+        state.reset_metrics()
     results = {}
     for r in results_list:
         results.update(r)
@@ -660,64 +1172,120 @@ async def eval_rollout_single_dataset(
         spaces_between_special_tokens=False,
     )
 
-    tasks = []
-    # do multiple samples for eval prompts
-    sample_index = 0
-    for _i, prompt_sample in enumerate(dataset.samples):
-        for j in range(dataset_cfg.n_samples_per_eval_prompt):
-            # use the same prompt for multiple samples
-            sample = copy.deepcopy(prompt_sample)
-            sample.index = sample_index
-            sample_index += 1
-            sample.metadata = dataset_cfg.inject_metadata(
-                getattr(sample, "metadata", None)
-            )
-            sample.generate_function_path = getattr(
-                dataset_cfg, "custom_generate_function_path", None
-            )
-            sampling_params = base_sampling_params
-            if getattr(args, "sglang_enable_deterministic_inference", False):
-                sampling_params = base_sampling_params.copy()
-                sampling_params["sampling_seed"] = args.rollout_seed + j
-            tasks.append(
-                asyncio.create_task(
-                    generate_and_rm(
-                        args,
-                        sample,
-                        sampling_params=sampling_params,
-                        evaluation=True,
-                    )
+    def iter_eval_samples():
+        # do multiple samples for eval prompts
+        sample_index = 0
+        for _i, prompt_sample in enumerate(dataset.samples):
+            for j in range(dataset_cfg.n_samples_per_eval_prompt):
+                # use the same prompt for multiple samples
+                sample = Sample.from_sample(prompt_sample)
+                sample.index = sample_index
+                sample_index += 1
+                sample.metadata = dataset_cfg.inject_metadata(
+                    getattr(sample, "metadata", None)
                 )
-            )
+                sample.generate_function_path = getattr(
+                    dataset_cfg, "custom_generate_function_path", None
+                )
+                sampling_params = base_sampling_params
+                if getattr(args, "sglang_enable_deterministic_inference", False):
+                    sampling_params = base_sampling_params.copy()
+                    sampling_params["sampling_seed"] = args.rollout_seed + j
+                yield sample, sampling_params
 
-    data = []
+    state = GenerateState(args)
+    reward_key = args.eval_reward_key or args.reward_key
+
+    output_file = None
+    output_lock = threading.Lock()
+    if EVAL_OUTPUT_DIR:
+        output_path = (
+            Path(EVAL_OUTPUT_DIR) / dataset_cfg.name / f"rollout_{rollout_id}.jsonl"
+        )
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_file = open(output_path, "w", encoding="utf-8")
+        logger.info(f"Writing eval samples of {dataset_cfg.name} to {output_path}")
+
+    # Finished samples and their rewards; samples without a numeric reward are counted and
+    # left out of the output.
+    results = []
+    num_missing_rewards = 0
+    reward_sum = 0.0
+    num_rewards = 0
     do_print = True
-    pbar = tqdm(total=len(tasks), desc=f"Eval {dataset_cfg.name}", disable=not do_print)
-    for coro in asyncio.as_completed(tasks):
-        sample = await coro
+    pbar = tqdm(
+        total=len(dataset.samples) * dataset_cfg.n_samples_per_eval_prompt,
+        desc=f"Eval {dataset_cfg.name}",
+        disable=not do_print,
+    )
+
+    def write_line(line: str):
+        with output_lock:
+            output_file.write(line)
+
+    async def on_sample(sample: Sample):
+        nonlocal reward_sum, num_rewards, num_missing_rewards, do_print
         if do_print:
             logger.info(
                 f"eval_rollout_single_dataset example data:\nmessages: {sample.messages}\nreward: {sample.reward}"
             )
             do_print = False
-        if isinstance(sample, list):
-            data.extend(sample)
+
+        reward = sample.reward
+        if reward_key and isinstance(reward, dict):
+            reward = reward.get(reward_key)
+        # Aborted or failed samples may have no reward.
+        if isinstance(reward, (int, float)):
+            results.append((sample, reward))
+            reward_sum += reward
+            num_rewards += 1
         else:
-            data.append(sample)
-        pbar.update(1)
-    pbar.close()
+            num_missing_rewards += 1
 
-    data.sort(key=lambda sample: sample.index)
+        if output_file is not None:
+            line = json.dumps(sample.to_dict(), ensure_ascii=False, default=str) + "\n"
+            await asyncio.to_thread(write_line, line)
 
-    reward_key = args.eval_reward_key or args.reward_key
+        if num_rewards:
+            pbar.set_postfix(reward=reward_sum / num_rewards)
+
+    # A fixed pool of workers pulls from the lazy sample iterator, so at most
+    # `concurrency` samples exist at a time.
+    pending = iter_eval_samples()
+
+    async def worker():
+        for sample, sampling_params in pending:
+            sample = await generate_and_rm(
+                args, sample, sampling_params=sampling_params, evaluation=True
+            )
+            for s in sample if isinstance(sample, list) else [sample]:
+                await on_sample(s)
+            pbar.update(1)
+
+    concurrency = EVAL_CONCURRENCY or state.trajectory_concurrency
+    try:
+        async with asyncio.TaskGroup() as tg:
+            for _ in range(concurrency):
+                tg.create_task(worker())
+    finally:
+        pbar.close()
+        if output_file is not None:
+            output_file.close()
+
+    if num_missing_rewards:
+        logger.warning(
+            f"{num_missing_rewards} eval samples of {dataset_cfg.name} have no reward "
+            "and are left out of the eval metrics."
+        )
+
+    results.sort(key=lambda result: result[0].index)
     return {
         dataset_cfg.name: {
-            "rewards": [
-                sample.reward if not reward_key else sample.reward[reward_key]
-                for sample in data
+            "rewards": [reward for _, reward in results],
+            "truncated": [
+                sample.status == Sample.Status.TRUNCATED for sample, _ in results
             ],
-            "truncated": [sample.status == Sample.Status.TRUNCATED for sample in data],
-            "samples": data,
+            "samples": [sample for sample, _ in results],
         }
     }
 
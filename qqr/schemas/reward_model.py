@@ -1,4 +1,8 @@
+import asyncio
 from abc import ABC, abstractmethod
+from collections.abc import Awaitable
+
+from qqr.utils.timing import stage_timer
 
 
 class RewardModel(ABC):
@@ -19,3 +23,31 @@ class GroupRewardModel(ABC):
     async def compute(
         self, predictions: list, reference=None, *args, **kwargs
     ) -> list[float] | list[dict[str, float]]: ...
+
+    async def compute_streaming(
+        self, predictions: list[Awaitable], *args, **kwargs
+    ) -> list[float] | list[dict[str, float]]:
+        """
+        Computes rewards for predictions that are still being generated.
+
+        Waits for all predictions by default; topologies override this to start judging
+        as soon as the participants of a comparison are available.
+        """
+        predictions = await asyncio.gather(*predictions)
+        return await self.compute(predictions, *args, **kwargs)
+
+    @property
+    def topology(self) -> str:
+        return type(self).__name__.removesuffix("GroupRewardModel")
+
+    async def bidirectional_compare(
+        self, messages_a: list[dict], messages_b: list[dict], *args, **kwargs
+    ) -> tuple[float, float, dict]:
+        """
+        Compares two predictions with `self.llm_judge`, recording the judge latency
+        per topology.
+        """
+        with stage_timer.time(f"judge/{self.topology}"):
+            return await self.llm_judge.bidirectional_compare(
+                messages_a, messages_b, *args, **kwargs
+            )
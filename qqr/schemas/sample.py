@@ -1,4 +1,5 @@
-from dataclasses import dataclass, field
+import copy
+from dataclasses import dataclass, field, fields, is_dataclass
 
 from slime.utils.types import Sample as BaseSample
 
@@ -9,6 +10,8 @@ class Sample(BaseSample):
 
     messages: list[dict[str, str]] = field(default_factory=list)
     response_message: dict[str, str] = None
+    # Number of leading `messages` already rendered into `tokens`, used by incremental tokenization.
+    num_tokenized_messages: int = 0
 
     def to_dict(self):
         keys = [
@@ -29,6 +32,40 @@ class Sample(BaseSample):
         value = {k: value[k] for k in keys if value[k] is not None}
         return value
 
+    @classmethod
+    def from_sample(cls, sample: BaseSample, **changes) -> "Sample":
+        """
+        Copy-on-write clone of `sample`.
+
+        Prompt, tokens, messages and other fields that are only ever reassigned during
+        rollout are shared. Containers that are mutated in place (the `messages` list,
+        `metadata`, `weight_versions` and nested dataclasses) are copied shallowly.
+        """
+        names = {f.name for f in fields(cls) if f.init}
+        value = {}
+        extras = {}
+        for k, v in sample.__dict__.items():
+            if is_dataclass(v):
+                v = copy.copy(v)
+            if k in names:
+                value[k] = v
+            else:
+                extras[k] = v
+
+        for k in ("messages", "weight_versions"):
+            if value.get(k) is not None:
+                value[k] = list(value[k])
+        if value.get("metadata") is not None:
+            value["metadata"] = dict(value["metadata"])
+
+        value.update(changes)
+        clone = cls(**value)
+        clone.__dict__.update(extras)
+        return clone
+
+    def clone(self, **changes) -> "Sample":
+        return self.from_sample(self, **changes)
+
     @staticmethod
     def from_dict(data: dict):
         data["status"] = BaseSample.Status(data["status"])
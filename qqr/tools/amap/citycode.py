@@ -0,0 +1,87 @@
+import csv
+import math
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from cachetools import LRUCache
+
+CITY_TABLE_PATH = Path(__file__).with_name("cities.csv")
+
+
+def haversine(lng1: float, lat1: float, lng2: float, lat2: float) -> float:
+    """
+    Great-circle distance between two points in kilometers.
+    """
+    lng1, lat1, lng2, lat2 = map(math.radians, (lng1, lat1, lng2, lat2))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 6371.0 * 2 * math.asin(math.sqrt(a))
+
+
+def parse_location(location: str) -> tuple[float, float] | None:
+    try:
+        lng, lat = (float(x) for x in location.split(","))
+    except ValueError:
+        return None
+    return lng, lat
+
+
+class CityCodeResolver:
+    """
+    Resolves the `citycode` of a "lng,lat" location for transit routing.
+
+    Locations are answered, in order, from an LRU cache keyed by coordinates rounded to
+    `precision` decimals, from the bundled table of city cores, and finally by `fallback`
+    (the `regeo` API).
+
+    The table is not boundary data: each row is a disk around a city center whose `radius`
+    (in kilometers) is chosen to lie inside the city's administrative region, e.g. 3 km for
+    Shenzhen, whose center is close to Hong Kong. Points outside every disk, including all
+    points in cities missing from the table, go to the API.
+    """
+
+    def __init__(
+        self,
+        fallback: Callable[[str], Awaitable[str | None]],
+        table_path: str | Path = CITY_TABLE_PATH,
+        maxsize: int = 65536,
+        precision: int = 3,
+    ):
+        self.fallback = fallback
+        self.precision = precision
+
+        with open(table_path, encoding="utf-8") as f:
+            self.cities = [
+                (
+                    row["citycode"],
+                    float(row["lng"]),
+                    float(row["lat"]),
+                    float(row["radius"]),
+                )
+                for row in csv.DictReader(f)
+            ]
+        self._cache = LRUCache(maxsize=maxsize)
+
+    def lookup_offline(self, lng: float, lat: float) -> str | None:
+        for citycode, city_lng, city_lat, radius in self.cities:
+            if haversine(lng, lat, city_lng, city_lat) <= radius:
+                return citycode
+        return None
+
+    async def resolve(self, location: str) -> str | None:
+        coordinates = parse_location(location)
+        if coordinates is None:
+            return await self.fallback(location)
+
+        lng, lat = coordinates
+        key = (round(lng, self.precision), round(lat, self.precision))
+        citycode = self._cache.get(key)
+        if citycode is not None:
+            return citycode
+
+        citycode = self.lookup_offline(lng, lat) or await self.fallback(location)
+        if citycode:
+            self._cache[key] = citycode
+        return citycode
@@ -1,13 +1,19 @@
 import asyncio
+import json
+from typing import Callable
 
-import httpx
+from cachetools import TTLCache
 from mcp.server.fastmcp import FastMCP
 
 from qqr.data.markdown import json2md
 from qqr.data.text import truncate_text
 from qqr.utils.envs import AMAP_MAPS_API_KEY
+from qqr.utils.http_client import SharedAsyncClient
 
-mcp = FastMCP("AMap", log_level="WARNING")
+from .citycode import CityCodeResolver
+
+http_client = SharedAsyncClient()
+mcp = FastMCP("AMap", log_level="WARNING", lifespan=http_client.lifespan)
 
 """
 获取环境变量中的 API 密钥, 用于调用高德地图 API
@@ -16,15 +22,28 @@ mcp = FastMCP("AMap", log_level="WARNING")
 API 文档: https://lbs.amap.com/api/webservice/summary
 """
 
+ROUTE_MODES = ["driving", "walking", "bicycling", "electrobike", "transit"]
+
+# Limits of `route_matrix`, which calls the direction API once per leg.
+ROUTE_MATRIX_MAX_POINTS = 10
+ROUTE_MATRIX_MAX_PAIR_POINTS = 6
+ROUTE_MATRIX_CONCURRENCY = 4
+
+# Batch POI search: maximum number of queries and length of the merged result.
+POI_BATCH_MAX_QUERIES = 10
+POI_BATCH_MAX_LEN = 10000
+
+# Recent POI search results, shared by single and batch searches.
+poi_cache = TTLCache(maxsize=4096, ttl=600)
+
 
 async def reverse_geocode(location: str):
     url = "https://restapi.amap.com/v3/geocode/regeo"
     params = {"key": AMAP_MAPS_API_KEY, "location": location}
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, params=params)
-        response.raise_for_status()
-        result = response.json()
+    response = await http_client.get(url, params=params)
+    response.raise_for_status()
+    result = response.json()
 
     return result
 
@@ -40,8 +59,75 @@ async def get_citycode(location: str):
     return citycode
 
 
+citycode_resolver = CityCodeResolver(fallback=get_citycode)
+
+
+async def search_pois(url: str, params: dict) -> list[dict]:
+    key = json.dumps([url, params], sort_keys=True, ensure_ascii=False)
+    pois = poi_cache.get(key)
+    if pois is not None:
+        return pois
+
+    response = await http_client.get(url, params=params)
+    response.raise_for_status()
+    result = response.json()
+
+    if result.get("status") != "1":
+        msg = result.get("info", "unknown error")
+        raise Exception(f"API response error: {msg}")
+
+    pois = result.get("pois")
+    if not pois:
+        raise Exception("No POI data available.")
+
+    poi_cache[key] = pois
+    return pois
+
+
+async def search_pois_batch(
+    queries: list[str], make_params: Callable[[str], dict], url: str
+) -> str:
+    """
+    Searches the queries concurrently and renders the results under one length budget,
+    shared equally by the queries. POIs already listed for an earlier query are skipped.
+    """
+    queries = list(dict.fromkeys(queries))
+    if not 1 <= len(queries) <= POI_BATCH_MAX_QUERIES:
+        raise Exception(f"Batch search supports 1 to {POI_BATCH_MAX_QUERIES} queries.")
+
+    results = await asyncio.gather(
+        *(search_pois(url, make_params(query)) for query in queries),
+        return_exceptions=True,
+    )
+    if all(isinstance(result, Exception) for result in results):
+        raise results[0]
+
+    max_len = POI_BATCH_MAX_LEN // len(queries)
+    seen = set()
+    sections = []
+    for query, result in zip(queries, results):
+        if isinstance(result, Exception):
+            sections.append(f"Query '{query}': Error - {result}")
+            continue
+
+        pois = [poi for poi in result if poi.get("id") not in seen]
+        seen.update(poi.get("id") for poi in pois)
+        if not pois:
+            sections.append(f"**Query: {query}**\n结果均已在上文列出。")
+            continue
+
+        # Keep as many whole POIs as fit in this query's share of the budget.
+        text = json2md(pois)
+        while len(text) > max_len and len(pois) > 1:
+            pois = pois[:-1]
+            text = json2md(pois)
+        sections.append(f"**Query: {query}**\n{truncate_text(text, max_len)}")
+
+    return "\n\n---\n\n".join(sections)
+
+
 @mcp.tool()
-async def poi_search(address: str, region: str | None = None) -> str:
+async def poi_search(address: str | list[str], region: str | None = None) -> str:
     """
     通过文本搜索地点信息。文本可以是结构化地址，例如：北京市朝阳区望京阜荣街10号；也可以是 POI 名称，例如：首开广场。
     返回多个可能相关的 POI 信息，包括：
@@ -51,34 +137,30 @@ async def poi_search(address: str, region: str | None = None) -> str:
     地址结构越完整，返回的结果越准确。
 
     Args:
-        address (`str`): 需要被检索的地点文本信息。只支持一个地址，文本总长度不可超过 80 字符。
+        address (`str | list[str]`): 需要被检索的地点文本信息，每个地址文本总长度不可超过 80 字符。
             推荐使用标准的结构化地址信息，如北京市海淀区上地十街十号。地址结构越完整，解析精度越高。
+            - 单个地址: 传入字符串，例如 "首开广场"。
+            - 批量检索: 传入字符串列表（最多 10 个），例如 ["西湖", "灵隐寺", "河坊街"]，结果将合并去重后返回。
         region (`Optional[str]`): 增加指定区域内数据召回权重，仅支持城市级别和中文，如“北京市”。
             默认为 None，表示在全国范围内搜索。
     """
 
     url = "https://restapi.amap.com/v5/place/text"
-    params = {
-        "key": AMAP_MAPS_API_KEY,
-        "keywords": address,
-        "show_fields": "business",
-    }
-    if region:
-        params["region"] = region
-
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, params=params)
-        response.raise_for_status()
-        result = response.json()
 
-    if result.get("status") != "1":
-        msg = result.get("info", "unknown error")
-        raise Exception(f"API response error: {msg}")
+    def make_params(address: str) -> dict:
+        params = {
+            "key": AMAP_MAPS_API_KEY,
+            "keywords": address,
+            "show_fields": "business",
+        }
+        if region:
+            params["region"] = region
+        return params
 
-    pois = result.get("pois")
-    if not pois:
-        raise Exception("No POI data available.")
+    if isinstance(address, list):
+        return await search_pois_batch(address, make_params, url)
 
+    pois = await search_pois(url, make_params(address))
     return truncate_text(json2md(pois))
 
 
@@ -86,7 +168,7 @@ async def poi_search(address: str, region: str | None = None) -> str:
 async def around_search(
     location: str,
     radius: int = 5000,
-    keyword: str | None = None,
+    keyword: str | list[str] | None = None,
     region: str | None = None,
 ) -> str:
     """
@@ -99,97 +181,110 @@ async def around_search(
     Args:
         location (`str`): 圆形区域检索的中心点坐标，不支持多个点。经度和纬度用","分割，经度在前，纬度在后，经纬度小数点后不得超过6位
         radius (`int`): 圆形区域的搜索半径，取值范围:0-50000，大于50000时按默认值，单位：米。
-        keyword (`str`): 需要被检索的地点文本信息。只支持一个关键字，如“银行”。
+        keyword (`str | list[str]`): 需要被检索的地点文本信息，如“银行”。
+            - 批量检索: 传入关键字列表（最多 10 个），例如 ["餐厅", "酒店", "地铁站"]，结果将合并去重后返回。
         region (`Optional[str]`): 增加指定区域内数据召回权重，仅支持城市级别和中文，如“北京市”。
             默认为 None，表示在全国范围内搜索。
     """
 
     url = "https://restapi.amap.com/v5/place/around"
-    params = {
-        "key": AMAP_MAPS_API_KEY,
-        "location": location,
-        "radius": radius,
-        "show_fields": "business",
-    }
-    if keyword:
-        params["keywords"] = keyword
-    if region:
-        params["region"] = region
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, params=params)
-        response.raise_for_status()
-        result = response.json()
-
-    if result.get("status") != "1":
-        msg = result.get("info", "unknown error")
-        raise Exception(f"API response error: {msg}")
+    def make_params(keyword: str | None) -> dict:
+        params = {
+            "key": AMAP_MAPS_API_KEY,
+            "location": location,
+            "radius": radius,
+            "show_fields": "business",
+        }
+        if keyword:
+            params["keywords"] = keyword
+        if region:
+            params["region"] = region
+        return params
 
-    pois = result.get("pois")
-    if not pois:
-        raise Exception("No POI data available.")
+    if isinstance(keyword, list):
+        return await search_pois_batch(keyword, make_params, url)
 
+    pois = await search_pois(url, make_params(keyword))
     return truncate_text(json2md(pois))
 
 
 async def driving_direction(
-    origin: str, destination: str, waypoints: str | None = None
+    origin: str,
+    destination: str,
+    waypoints: str | None = None,
+    show_fields: str | None = None,
 ):
     url = "https://restapi.amap.com/v5/direction/driving?parameters"
     params = {"key": AMAP_MAPS_API_KEY, "origin": origin, "destination": destination}
 
     if waypoints:
         params["waypoints"] = waypoints
+    if show_fields:
+        params["show_fields"] = show_fields
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, params=params)
-        response.raise_for_status()
-        result = response.json()
+    response = await http_client.get(url, params=params)
+    response.raise_for_status()
+    result = response.json()
 
     return result
 
 
-async def walking_direction(origin: str, destination: str):
+async def walking_direction(
+    origin: str, destination: str, show_fields: str | None = None
+):
     url = "https://restapi.amap.com/v5/direction/walking?parameters"
     params = {"key": AMAP_MAPS_API_KEY, "origin": origin, "destination": destination}
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, params=params)
-        response.raise_for_status()
-        result = response.json()
+    if show_fields:
+        params["show_fields"] = show_fields
+
+    response = await http_client.get(url, params=params)
+    response.raise_for_status()
+    result = response.json()
 
     return result
 
 
-async def bicycling_direction(origin: str, destination: str):
+async def bicycling_direction(
+    origin: str, destination: str, show_fields: str | None = None
+):
     url = "https://restapi.amap.com/v5/direction/bicycling?parameters"
     params = {"key": AMAP_MAPS_API_KEY, "origin": origin, "destination": destination}
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, params=params)
-        response.raise_for_status()
-        result = response.json()
+    if show_fields:
+        params["show_fields"] = show_fields
+
+    response = await http_client.get(url, params=params)
+    response.raise_for_status()
+    result = response.json()
 
     return result
 
 
-async def electrobike_direction(origin: str, destination: str):
+async def electrobike_direction(
+    origin: str, destination: str, show_fields: str | None = None
+):
     url = "https://restapi.amap.com/v5/direction/electrobike?parameters"
     params = {"key": AMAP_MAPS_API_KEY, "origin": origin, "destination": destination}
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, params=params)
-        response.raise_for_status()
-        result = response.json()
+    if show_fields:
+        params["show_fields"] = show_fields
+
+    response = await http_client.get(url, params=params)
+    response.raise_for_status()
+    result = response.json()
 
     return result
 
 
-async def transit_direction(origin: str, destination: str):
+async def transit_direction(
+    origin: str, destination: str, show_fields: str | None = None
+):
     url = "https://restapi.amap.com/v5/direction/transit/integrated?parameters"
 
     citycode_origin, citycode_destination = await asyncio.gather(
-        get_citycode(origin), get_citycode(destination)
+        citycode_resolver.resolve(origin), citycode_resolver.resolve(destination)
     )
 
     if not citycode_origin:
@@ -205,15 +300,51 @@ async def transit_direction(origin: str, destination: str):
         "city1": citycode_origin,
         "city2": citycode_destination,
     }
+    if show_fields:
+        params["show_fields"] = show_fields
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, params=params)
-        response.raise_for_status()
-        result = response.json()
+    response = await http_client.get(url, params=params)
+    response.raise_for_status()
+    result = response.json()
 
     return result
 
 
+async def get_route(
+    origin: str,
+    destination: str,
+    mode: str = "driving",
+    waypoints: str | None = None,
+    show_fields: str | None = None,
+) -> dict:
+    if mode == "driving":
+        result = await driving_direction(
+            origin, destination, waypoints=waypoints, show_fields=show_fields
+        )
+    elif mode == "walking":
+        result = await walking_direction(origin, destination, show_fields=show_fields)
+    elif mode == "bicycling":
+        result = await bicycling_direction(origin, destination, show_fields=show_fields)
+    elif mode == "electrobike":
+        result = await electrobike_direction(
+            origin, destination, show_fields=show_fields
+        )
+    elif mode == "transit":
+        result = await transit_direction(origin, destination, show_fields=show_fields)
+    else:
+        raise Exception(f"Unsupported mode: {mode}")
+
+    if result.get("status") != "1":
+        msg = result.get("info", "unknown error")
+        raise Exception(f"API response error: {msg}")
+
+    route = result.get("route")
+    if not route:
+        raise Exception("No route available.")
+
+    return route
+
+
 @mcp.tool()
 async def direction(
     origin: str, destination: str, mode: str = "driving", waypoints: str | None = None
@@ -229,26 +360,105 @@ async def direction(
         waypoints: 途经点。经度和纬度用","分割，经度在前，纬度在后，小数点后不超过6位，坐标点之间用";"分隔。
             - 最大数目：16个坐标点。
     """
-    if mode == "driving":
-        result = await driving_direction(origin, destination, waypoints=waypoints)
-    elif mode == "walking":
-        result = await walking_direction(origin, destination)
-    elif mode == "bicycling":
-        result = await bicycling_direction(origin, destination)
-    elif mode == "electrobike":
-        result = await electrobike_direction(origin, destination)
-    elif mode == "transit":
-        result = await transit_direction(origin, destination)
+    route = await get_route(origin, destination, mode=mode, waypoints=waypoints)
+    return truncate_text(json2md(route))
 
-    if result.get("status") != "1":
-        msg = result.get("info", "unknown error")
-        raise Exception(f"API response error: {msg}")
 
-    route = result.get("route")
-    if not route:
+def summarize_route(route: dict, mode: str) -> dict:
+    """
+    Extracts the distance, duration and, for transit, the fare of the recommended route.
+    """
+    plans = route.get("transits" if mode == "transit" else "paths") or []
+    if not plans:
         raise Exception("No route available.")
 
-    return truncate_text(json2md(route))
+    plan = plans[0]
+    cost = plan.get("cost") or {}
+    summary = {
+        "distance": int(plan.get("distance") or route.get("distance") or 0),
+        "duration": int(cost.get("duration") or plan.get("duration") or 0),
+    }
+    if mode == "transit":
+        summary["fare"] = cost.get("transit_fee")
+    return summary
+
+
+@mcp.tool()
+async def route_matrix(
+    points: list[str], mode: str = "driving", itinerary: bool = True
+) -> str:
+    """
+    批量路线规划。一次计算多个地点之间的路线，返回各段路线的距离、耗时（公交还包括票价）汇总表。
+    适合多日行程或多个景点之间的路线规划，替代多次调用 direction 工具。如需详细的导航步骤，请使用 direction 工具。
+
+    Args:
+        points (`list[str]`): 地点坐标列表，按行程顺序排列，至少 2 个。每个坐标经度在前，纬度在后，经度和纬度用","分割，经纬度小数点后不得超过6位。
+        mode (`str`): 路线规划类型，默认为驾车路线规划。
+            - Enum: ["driving", "walking", "bicycling", "electrobike", "transit"]。
+        itinerary (`bool`): 为 True 时按顺序计算相邻地点之间的路线（最多 10 个地点）；
+            为 False 时计算任意两个地点之间的路线（最多 6 个地点）。默认为 True。
+    """
+    if mode not in ROUTE_MODES:
+        raise Exception(f"Unsupported mode: {mode}. Supported modes: {ROUTE_MODES}.")
+
+    max_points = ROUTE_MATRIX_MAX_POINTS if itinerary else ROUTE_MATRIX_MAX_PAIR_POINTS
+    if not 2 <= len(points) <= max_points:
+        raise Exception(f"route_matrix requires 2 to {max_points} points.")
+
+    if itinerary:
+        legs = [(i, i + 1) for i in range(len(points) - 1)]
+    else:
+        legs = [(i, j) for i in range(len(points)) for j in range(i + 1, len(points))]
+
+    semaphore = asyncio.Semaphore(ROUTE_MATRIX_CONCURRENCY)
+
+    async def get_leg(i: int, j: int) -> dict:
+        async with semaphore:
+            route = await get_route(points[i], points[j], mode=mode, show_fields="cost")
+        return summarize_route(route, mode)
+
+    results = await asyncio.gather(
+        *(get_leg(i, j) for i, j in legs), return_exceptions=True
+    )
+    # Keep the cause, e.g. throttling, so that transient failures are not cached as
+    # deterministic "No route available" errors.
+    if all(isinstance(result, Exception) for result in results):
+        raise results[0]
+
+    columns = ["起点", "终点", "距离(公里)", "耗时(分钟)"]
+    if mode == "transit":
+        columns.append("票价(元)")
+
+    lines = [
+        "地点: " + "; ".join(f"P{i + 1}={point}" for i, point in enumerate(points)),
+        "",
+        "| " + " | ".join(columns) + " |",
+        "|" + " --- |" * len(columns),
+    ]
+    for (i, j), result in zip(legs, results):
+        row = [f"P{i + 1}", f"P{j + 1}"]
+        if isinstance(result, Exception):
+            row += [f"无路线: {result}"] + [""] * (len(columns) - 3)
+        else:
+            row += [
+                f"{result['distance'] / 1000:.1f}",
+                f"{result['duration'] / 60:.0f}",
+            ]
+            if mode == "transit":
+                row.append(str(result.get("fare") or ""))
+        lines.append("| " + " | ".join(row) + " |")
+
+    if itinerary:
+        summaries = [r for r in results if not isinstance(r, Exception)]
+        distance = sum(r["distance"] for r in summaries) / 1000
+        duration = sum(r["duration"] for r in summaries) / 60
+        lines.append("")
+        total = f"合计: {distance:.1f} 公里, {duration:.0f} 分钟"
+        if len(summaries) < len(results):
+            total += " (不含无路线的路段)"
+        lines.append(total)
+
+    return truncate_text("\n".join(lines))
 
 
 @mcp.tool()
@@ -267,10 +477,9 @@ async def weather(city: str) -> str:
         "extensions": "all",
     }
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, params=params)
-        response.raise_for_status()
-        result = response.json()
+    response = await http_client.get(url, params=params)
+    response.raise_for_status()
+    result = response.json()
 
     if result.get("status") != "1":
         msg = result.get("info", "unknown error")
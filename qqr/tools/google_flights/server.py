@@ -1,10 +1,12 @@
 import os
 import re
 
-import httpx
 from mcp.server.fastmcp import FastMCP
 
-mcp = FastMCP("GoogleFlights", log_level="WARNING")
+from qqr.utils.http_client import SharedAsyncClient
+
+http_client = SharedAsyncClient()
+mcp = FastMCP("GoogleFlights", log_level="WARNING", lifespan=http_client.lifespan)
 
 """
 SerpApi Google Flights API
@@ -211,13 +213,12 @@ async def search_flights(
         "adults": adults,
         "currency": "CNY",
         "hl": "zh-CN",
-        "api_key": SERPAPI_API_KEY,
+        "api_key": SERPER_API_KEY,
     }
     
-    async with httpx.AsyncClient(timeout=60) as client:
-        response = await client.get(SERPER_URL, params=params)
-        response.raise_for_status()
-        result = response.json()
+    response = await http_client.get(SERPER_URL, params=params)
+    response.raise_for_status()
+    result = response.json()
     
     # Check for errors
     if error := result.get("error"):
@@ -1,10 +1,15 @@
+import asyncio
+import json
 import os
 import re
 
-import httpx
+from cachetools import TTLCache
 from mcp.server.fastmcp import FastMCP
 
-mcp = FastMCP("GoogleMaps", log_level="WARNING")
+from qqr.utils.http_client import SharedAsyncClient
+
+http_client = SharedAsyncClient()
+mcp = FastMCP("GoogleMaps", log_level="WARNING", lifespan=http_client.lifespan)
 
 """
 SerpApi Google Maps API
@@ -19,6 +24,13 @@ Environment variable: SERPER_API_KEY
 SERPER_API_KEY = os.getenv("SERPER_API_KEY")
 SERPER_URL = os.getenv("SERPER_URL", "https://serpapi.com/search")
 
+# Batch POI search: maximum number of queries and length of the merged result
+POI_BATCH_MAX_QUERIES = 10
+POI_BATCH_MAX_LEN = 10000
+
+# Recent search results, shared by single and batch searches
+_search_cache = TTLCache(maxsize=4096, ttl=600)
+
 
 # ========== Inline helpers (to avoid qqr package import issues) ==========
 
@@ -97,42 +109,64 @@ def _is_coordinates(location: str) -> bool:
     return "," in location and location.replace(",", "").replace(".", "").replace("-", "").replace(" ", "").isdigit()
 
 
-# ========== MCP Tools ==========
-
-@mcp.tool()
-async def poi_search(query: str, location: str | None = None) -> str:
-    """
-    通过文本搜索地点信息 (POI)。可以搜索餐厅、酒店、景点等。
-    返回多个可能相关的 POI 信息，包括：
-        - 名称和地址
-        - 评分和评论数
-        - GPS 坐标
-        - 联系方式
-
-    Args:
-        query (`str`): 搜索关键词，如 "咖啡店"、"酒店"、"西湖景点"。
-        location (`Optional[str]`): 搜索位置，如 "杭州" 或 "北京市海淀区"。
-            如果不提供，将在全球范围搜索。
-    """
-    params = {
-        "engine": "google_maps",
-        "q": query,
-        "type": "search",
-        "api_key": SERPER_API_KEY,
-    }
-
-    if location:
-        params["q"] = f"{query} {location}"
+async def _search_local(params: dict) -> list[dict]:
+    """Search Google Maps, caching the local results of recent searches."""
+    key = json.dumps(params, sort_keys=True, ensure_ascii=False)
+    if key in _search_cache:
+        return _search_cache[key]
 
-    async with httpx.AsyncClient(timeout=60) as client:
-        response = await client.get(SERPER_URL, params=params)
-        response.raise_for_status()
-        result = response.json()
+    response = await http_client.get(SERPER_URL, params=params)
+    response.raise_for_status()
+    result = response.json()
 
     local_results = result.get("local_results", [])
     if not local_results:
         raise Exception("No POI data available.")
 
+    _search_cache[key] = local_results
+    return local_results
+
+
+def _place_id(item: dict):
+    return item.get("place_id") or item.get("data_id") or (item.get("title"), item.get("address"))
+
+
+async def _search_batch(queries, make_params, format_pois) -> str:
+    """Search queries concurrently and merge de-duplicated results under one length budget."""
+    queries = list(dict.fromkeys(queries))
+    if not 1 <= len(queries) <= POI_BATCH_MAX_QUERIES:
+        raise Exception(f"Batch search supports 1 to {POI_BATCH_MAX_QUERIES} queries.")
+
+    tasks = [_search_local(make_params(q)) for q in queries]
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    if all(isinstance(result, Exception) for result in results):
+        raise results[0]
+
+    max_len = POI_BATCH_MAX_LEN // len(queries)
+    seen = set()
+    sections = []
+    for query, result in zip(queries, results):
+        if isinstance(result, Exception):
+            sections.append(f"Query '{query}': Error - {result}")
+            continue
+
+        items = [item for item in result[:10] if _place_id(item) not in seen]
+        seen.update(_place_id(item) for item in items)
+        if not items:
+            sections.append(f"**Query: {query}**\nAll results are listed above.")
+            continue
+
+        # Keep as many whole POIs as fit in this query's share of the budget
+        text = _json2md(format_pois(items))
+        while len(text) > max_len and len(items) > 1:
+            items = items[:-1]
+            text = _json2md(format_pois(items))
+        sections.append(f"**Query: {query}**\n{_truncate_text(text, max_len)}")
+
+    return "\n\n---\n\n".join(sections)
+
+
+def _format_pois(local_results: list[dict], website: bool = True) -> list[dict]:
     formatted = []
     for item in local_results[:10]:  # Limit to top 10
         poi = {
@@ -142,19 +176,56 @@ async def poi_search(query: str, location: str | None = None) -> str:
             "reviews": item.get("reviews"),
             "type": item.get("type"),
             "phone": item.get("phone"),
-            "website": item.get("website"),
         }
+        if website:
+            poi["website"] = item.get("website")
         if coords := item.get("gps_coordinates"):
             poi["location"] = f"{coords.get('longitude')},{coords.get('latitude')}"
         formatted.append(poi)
+    return formatted
 
-    return _truncate_text(_json2md(formatted))
+
+# ========== MCP Tools ==========
+
+@mcp.tool()
+async def poi_search(query: str | list[str], location: str | None = None) -> str:
+    """
+    通过文本搜索地点信息 (POI)。可以搜索餐厅、酒店、景点等。
+    返回多个可能相关的 POI 信息，包括：
+        - 名称和地址
+        - 评分和评论数
+        - GPS 坐标
+        - 联系方式
+
+    Args:
+        query (`str | list[str]`): 搜索关键词，如 "咖啡店"、"酒店"、"西湖景点"。
+            - 批量查询: 传入字符串列表（最多 10 个），例如 ["西湖", "灵隐寺", "河坊街"]，结果将合并去重后返回。
+        location (`Optional[str]`): 搜索位置，如 "杭州" 或 "北京市海淀区"。
+            如果不提供，将在全球范围搜索。
+    """
+    def make_params(query: str) -> dict:
+        params = {
+            "engine": "google_maps",
+            "q": query,
+            "type": "search",
+            "api_key": SERPER_API_KEY,
+        }
+
+        if location:
+            params["q"] = f"{query} {location}"
+        return params
+
+    if isinstance(query, list):
+        return await _search_batch(query, make_params, _format_pois)
+
+    local_results = await _search_local(make_params(query))
+    return _truncate_text(_json2md(_format_pois(local_results)))
 
 
 @mcp.tool()
 async def around_search(
     location: str,
-    keyword: str | None = None,
+    keyword: str | list[str] | None = None,
     radius: int = 5000,
 ) -> str:
     """
@@ -165,54 +236,41 @@ async def around_search(
         location (`str`): 中心点坐标或地址。
             - 坐标格式: "经度,纬度"，如 "120.15,30.28"
             - 地址格式: "杭州西湖"
-        keyword (`Optional[str]`): 搜索关键词，如 "银行"、"餐厅"。
+        keyword (`Optional[str | list[str]]`): 搜索关键词，如 "银行"、"餐厅"。
+            - 批量查询: 传入关键词列表（最多 10 个），例如 ["餐厅", "酒店", "地铁站"]，结果将合并去重后返回。
         radius (`int`): 搜索半径（米），默认 5000 米。此参数仅作参考，实际结果由 Google 决定。
     """
-    # Build search query
-    search_query = keyword if keyword else "places"
-
-    params = {
-        "engine": "google_maps",
-        "q": search_query,
-        "type": "search",
-        "api_key": SERPER_API_KEY,
-    }
+    def make_params(keyword: str | None) -> dict:
+        # Build search query
+        search_query = keyword if keyword else "places"
+
+        params = {
+            "engine": "google_maps",
+            "q": search_query,
+            "type": "search",
+            "api_key": SERPER_API_KEY,
+        }
 
-    # Check if location is coordinates (contains comma and numbers)
-    if _is_coordinates(location):
-        # Format: longitude,latitude -> need to convert to latitude,longitude for Google
-        parts = location.split(",")
-        if len(parts) == 2:
-            lon, lat = parts[0].strip(), parts[1].strip()
-            params["ll"] = f"@{lat},{lon},15z"  # zoom level 15
-    else:
-        # It's an address, add to query
-        params["q"] = f"{search_query} near {location}"
+        # Check if location is coordinates (contains comma and numbers)
+        if _is_coordinates(location):
+            # Format: longitude,latitude -> need to convert to latitude,longitude for Google
+            parts = location.split(",")
+            if len(parts) == 2:
+                lon, lat = parts[0].strip(), parts[1].strip()
+                params["ll"] = f"@{lat},{lon},15z"  # zoom level 15
+        else:
+            # It's an address, add to query
+            params["q"] = f"{search_query} near {location}"
+        return params
 
-    async with httpx.AsyncClient(timeout=60) as client:
-        response = await client.get(SERPER_URL, params=params)
-        response.raise_for_status()
-        result = response.json()
+    def format_pois(local_results: list[dict]) -> list[dict]:
+        return _format_pois(local_results, website=False)
 
-    local_results = result.get("local_results", [])
-    if not local_results:
-        raise Exception("No POI data available.")
-
-    formatted = []
-    for item in local_results[:10]:
-        poi = {
-            "name": item.get("title"),
-            "address": item.get("address"),
-            "rating": item.get("rating"),
-            "reviews": item.get("reviews"),
-            "type": item.get("type"),
-            "phone": item.get("phone"),
-        }
-        if coords := item.get("gps_coordinates"):
-            poi["location"] = f"{coords.get('longitude')},{coords.get('latitude')}"
-        formatted.append(poi)
+    if isinstance(keyword, list):
+        return await _search_batch(keyword, make_params, format_pois)
 
-    return _truncate_text(_json2md(formatted))
+    local_results = await _search_local(make_params(keyword))
+    return _truncate_text(_json2md(format_pois(local_results)))
 
 
 @mcp.tool()
@@ -248,10 +306,9 @@ async def direction(
     else:
         params["end_addr"] = destination
 
-    async with httpx.AsyncClient(timeout=60) as client:
-        response = await client.get(SERPER_URL, params=params)
-        response.raise_for_status()
-        result = response.json()
+    response = await http_client.get(SERPER_URL, params=params)
+    response.raise_for_status()
+    result = response.json()
 
     # Check for errors
     if error := result.get("error"):
@@ -2,10 +2,12 @@ import asyncio
 import os
 import re
 
-import httpx
 from mcp.server.fastmcp import FastMCP
 
-mcp = FastMCP("WebSearch", log_level="WARNING")
+from qqr.utils.http_client import SharedAsyncClient
+
+http_client = SharedAsyncClient()
+mcp = FastMCP("WebSearch", log_level="WARNING", lifespan=http_client.lifespan)
 
 """
 SerpApi Google Search API
@@ -93,7 +95,7 @@ def _truncate_text(text, max_len=5000):
 
 # ========== API Functions ==========
 
-async def _search_single(client: httpx.AsyncClient, query: str) -> dict:
+async def _search_single(query: str) -> dict:
     """Execute a single search query."""
     params = {
         "engine": "google",
@@ -101,7 +103,7 @@ async def _search_single(client: httpx.AsyncClient, query: str) -> dict:
         "api_key": SERPAPI_API_KEY,
         "output": "json",
     }
-    response = await client.get(SERPAPI_BASE_URL, params=params)
+    response = await http_client.get(SERPAPI_BASE_URL, params=params)
     response.raise_for_status()
     return response.json()
 
@@ -149,9 +151,8 @@ async def web_search(query: str | list[str]) -> str:
     """
     queries = [query] if isinstance(query, str) else query
 
-    async with httpx.AsyncClient(timeout=60) as client:
-        tasks = [_search_single(client, q) for q in queries]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+    tasks = [_search_single(q) for q in queries]
+    results = await asyncio.gather(*tasks, return_exceptions=True)
 
     formatted_results = []
     for i, result in enumerate(results):
@@ -7,6 +7,63 @@ RETRY_STOP_AFTER_ATTEMPT = int(os.getenv("RETRY_STOP_AFTER_ATTEMPT", 3))
 RETRY_WAIT_FIXED = float(os.getenv("RETRY_WAIT_FIXED", 1.0))
 
 
+# region: Rollout
+
+# Re-render the full conversation after each incremental tokenization and warn on mismatch.
+INCREMENTAL_TOKENIZATION_CHECK = to_bool(
+    os.getenv("INCREMENTAL_TOKENIZATION_CHECK", "False")
+)
+
+# Max trajectories in flight (including those waiting on tools or the judge). Defaults to
+# TRAJECTORY_OVERSUBSCRIPTION times the SGLang generation concurrency, so that trajectories
+# waiting on tools leave generation slots for others instead of idling the GPUs.
+MAX_INFLIGHT_TRAJECTORIES = int(os.getenv("MAX_INFLIGHT_TRAJECTORIES", 0))
+TRAJECTORY_OVERSUBSCRIPTION = float(os.getenv("TRAJECTORY_OVERSUBSCRIPTION", 2.0))
+
+# Pin all trajectories of a group (not just all turns of a trajectory) to the same DP rank.
+DP_GROUP_AFFINITY = to_bool(os.getenv("DP_GROUP_AFFINITY", "False"))
+
+# Group reward function that starts judging as trajectories finish, e.g.
+# "qqr.examples.travel.streaming_group_reward". Replaces `--custom-rm-path` for group RM.
+STREAMING_GROUP_RM_PATH = os.getenv("STREAMING_GROUP_RM_PATH")
+
+# Max eval samples in flight per dataset. Defaults to the trajectory concurrency.
+EVAL_CONCURRENCY = int(os.getenv("EVAL_CONCURRENCY", 0))
+
+# Also write finished eval samples to `<EVAL_OUTPUT_DIR>/<dataset>/rollout_<id>.jsonl` as
+# they complete, so that partial results survive a failed eval.
+EVAL_OUTPUT_DIR = os.getenv("EVAL_OUTPUT_DIR")
+
+# Render tool results without pretty-printing or null fields, saving CPU and context tokens.
+COMPACT_TOOL_MESSAGES = to_bool(os.getenv("COMPACT_TOOL_MESSAGES", "False"))
+
+# Measure event-loop lag and record callbacks that block the loop longer than the threshold.
+LOOP_MONITOR = to_bool(os.getenv("LOOP_MONITOR", "False"))
+LOOP_MONITOR_INTERVAL = float(os.getenv("LOOP_MONITOR_INTERVAL", 0.1))
+LOOP_MONITOR_SLOW_CALLBACK_MS = float(os.getenv("LOOP_MONITOR_SLOW_CALLBACK_MS", 100))
+# Number of slowest callbacks logged per rollout.
+LOOP_MONITOR_TOP_K = int(os.getenv("LOOP_MONITOR_TOP_K", 5))
+
+# endregion
+
+
+# region: MCP
+
+# Share tool results across processes and restarts through `<MCP_CACHE_DIR>/tool_results.sqlite`,
+# and persist the tool lists of MCP servers in `<MCP_CACHE_DIR>/tool_catalog.json`.
+MCP_CACHE_DIR = os.getenv("MCP_CACHE_DIR")
+# Cache file of a previous run to import unexpired tool results from.
+MCP_CACHE_WARM_START = os.getenv("MCP_CACHE_WARM_START")
+
+# Record every tool call and result to a JSONL archive, or replay an archive instead of
+# starting the MCP servers, optionally adding the recorded latency.
+MCP_RECORD_PATH = os.getenv("MCP_RECORD_PATH")
+MCP_REPLAY_PATH = os.getenv("MCP_REPLAY_PATH")
+MCP_REPLAY_LATENCY = to_bool(os.getenv("MCP_REPLAY_LATENCY", "False"))
+
+# endregion
+
+
 # region: LLMs
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
@@ -35,6 +92,12 @@ SERPER_URL = os.getenv("SERPER_URL", "https://serpapi.com/search")
 GOOGLE_MAPS_API_KEY = os.getenv("GOOGLE_MAPS_API_KEY")
 AMAP_MAPS_API_KEY = os.getenv("AMAP_MAPS_API_KEY")
 
+# HTTP client shared by the calls of a tool server
+TOOL_HTTP_CONNECT_TIMEOUT = float(os.getenv("TOOL_HTTP_CONNECT_TIMEOUT", 10))
+TOOL_HTTP_READ_TIMEOUT = float(os.getenv("TOOL_HTTP_READ_TIMEOUT", 60))
+TOOL_HTTP_MAX_CONNECTIONS = int(os.getenv("TOOL_HTTP_MAX_CONNECTIONS", 100))
+TOOL_HTTP2 = to_bool(os.getenv("TOOL_HTTP2", "True"))
+
 # endregion
 
 PYTHONPATH = os.getenv("PYTHONPATH")
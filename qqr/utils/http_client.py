@@ -0,0 +1,85 @@
+import asyncio
+import importlib.util
+import logging
+from contextlib import asynccontextmanager
+
+import httpx
+
+from .envs import (
+    TOOL_HTTP2,
+    TOOL_HTTP_CONNECT_TIMEOUT,
+    TOOL_HTTP_MAX_CONNECTIONS,
+    TOOL_HTTP_READ_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class SharedAsyncClient:
+    """
+    An `httpx.AsyncClient` shared by all calls of a tool server, so that connections are kept
+    alive and reused instead of paying a TLS handshake per request.
+
+    The client is created lazily and bound to the running event loop; it is recreated if the
+    loop changes. Pass `lifespan` to `FastMCP` to close it when the server shuts down.
+    """
+
+    def __init__(
+        self,
+        connect_timeout: float = TOOL_HTTP_CONNECT_TIMEOUT,
+        read_timeout: float = TOOL_HTTP_READ_TIMEOUT,
+        max_connections: int = TOOL_HTTP_MAX_CONNECTIONS,
+        http2: bool = TOOL_HTTP2,
+    ):
+        """
+        Args:
+            connect_timeout: Timeout for establishing a connection in seconds.
+            read_timeout: Timeout for reading, writing and waiting for a pooled connection
+                in seconds.
+            max_connections: Maximum number of connections, all of which are kept alive.
+            http2: Use HTTP/2 if the `h2` package is installed.
+        """
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning(
+                "HTTP/2 requires `pip install httpx[http2]`, using HTTP/1.1."
+            )
+            http2 = False
+
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        )
+        self.http2 = http2
+
+        self._client: httpx.AsyncClient | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout, limits=self.limits, http2=self.http2
+            )
+            self._loop = loop
+        return self._client
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.client.get(url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.client.post(url, **kwargs)
+
+    async def aclose(self):
+        if self._client is not None and self._loop is asyncio.get_running_loop():
+            await self._client.aclose()
+        self._client = None
+        self._loop = None
+
+    @asynccontextmanager
+    async def lifespan(self, server):
+        try:
+            yield {}
+        finally:
+            await self.aclose()
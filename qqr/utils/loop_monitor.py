@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import os
+import time
+from collections import defaultdict
+
+import numpy as np
+
+from .envs import (
+    LOOP_MONITOR_INTERVAL,
+    LOOP_MONITOR_SLOW_CALLBACK_MS,
+    LOOP_MONITOR_TOP_K,
+)
+
+logger = logging.getLogger(__name__)
+
+_asyncio_dir = os.path.dirname(asyncio.__file__)
+
+
+def describe_callback(handle: asyncio.Handle) -> str:
+    """
+    Names the code a callback ran. For task steps this is the innermost non-asyncio
+    coroutine of the task and the line it suspended at, i.e. the first `await` after the
+    blocking code.
+    """
+    callback = handle._callback
+    task = getattr(callback, "__self__", None)
+    if isinstance(task, asyncio.Task):
+        coro = task.get_coro()
+        name = getattr(coro, "__qualname__", repr(coro))
+        while coro is not None:
+            frame = getattr(coro, "cr_frame", None) or getattr(coro, "ag_frame", None)
+            if frame is not None and not frame.f_code.co_filename.startswith(
+                _asyncio_dir
+            ):
+                name = f"{coro.__qualname__}:{frame.f_lineno}"
+            coro = getattr(coro, "cr_await", None) or getattr(coro, "ag_await", None)
+            if not hasattr(coro, "__qualname__"):
+                break
+        return name
+
+    return getattr(callback, "__qualname__", repr(callback))
+
+
+class LoopMonitor:
+    """
+    Measures event-loop lag with a heartbeat task and records the callbacks that block the
+    loop for longer than `slow_callback_ms`.
+    """
+
+    def __init__(
+        self,
+        interval: float = LOOP_MONITOR_INTERVAL,
+        slow_callback_ms: float = LOOP_MONITOR_SLOW_CALLBACK_MS,
+        top_k: int = LOOP_MONITOR_TOP_K,
+    ):
+        self.interval = interval
+        self.slow_callback_threshold = slow_callback_ms / 1000
+        self.top_k = top_k
+
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._heartbeat: asyncio.Task | None = None
+        self._original_run = None
+
+        self.reset()
+
+    def reset(self):
+        self.lags: list[float] = []
+        self.slow_callbacks: dict[str, list[float]] = defaultdict(list)
+
+    def start(self):
+        """
+        Starts monitoring the running event loop and clears previous records. Safe to call
+        at the start of every rollout.
+        """
+        self.reset()
+
+        loop = asyncio.get_running_loop()
+        if self._heartbeat is not None and not self._heartbeat.done():
+            if self._loop is loop:
+                return
+            self._heartbeat.cancel()
+
+        self._loop = loop
+        self._heartbeat = loop.create_task(self.heartbeat())
+        self.patch_handle()
+
+    async def heartbeat(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(time.perf_counter() - start - self.interval, 0.0))
+
+    def patch_handle(self):
+        if self._original_run is not None:
+            return
+
+        monitor = self
+        original_run = self._original_run = asyncio.Handle._run
+
+        def _run(handle: asyncio.Handle):
+            if monitor._loop is not handle._loop:
+                return original_run(handle)
+
+            start = time.perf_counter()
+            try:
+                return original_run(handle)
+            finally:
+                duration = time.perf_counter() - start
+                if duration > monitor.slow_callback_threshold:
+                    monitor.slow_callbacks[describe_callback(handle)].append(duration)
+
+        asyncio.Handle._run = _run
+
+    def collect(self, prefix: str = "rollout/loop") -> dict[str, float]:
+        metrics = {}
+        if self.lags:
+            p50, p95, p99 = np.percentile(self.lags, (50, 95, 99))
+            metrics[f"{prefix}/lag/p50"] = float(p50)
+            metrics[f"{prefix}/lag/p95"] = float(p95)
+            metrics[f"{prefix}/lag/p99"] = float(p99)
+            metrics[f"{prefix}/lag/max"] = float(np.max(self.lags))
+
+        # Callback names are unbounded, so they are only logged and the metrics aggregate
+        # over all slow callbacks.
+        durations = [d for durations in self.slow_callbacks.values() for d in durations]
+        metrics[f"{prefix}/slow_callbacks"] = len(durations)
+        if durations:
+            metrics[f"{prefix}/slow_callback/total"] = float(np.sum(durations))
+            metrics[f"{prefix}/slow_callback/p99"] = float(np.percentile(durations, 99))
+            metrics[f"{prefix}/slow_callback/max"] = float(np.max(durations))
+
+        offenders = sorted(
+            self.slow_callbacks.items(), key=lambda item: sum(item[1]), reverse=True
+        )
+        for name, durations in offenders[: self.top_k]:
+            logger.info(
+                f"Slow event loop callback {name}: {len(durations)} times, "
+                f"{np.sum(durations):.3f}s in total, {np.max(durations):.3f}s max"
+            )
+        return metrics
+
+
+loop_monitor = LoopMonitor()
@@ -0,0 +1,57 @@
+import asyncio
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager, contextmanager
+
+import numpy as np
+
+
+class StageTimer:
+    """
+    Collects per-stage durations (in seconds) or other per-event values over a rollout
+    and aggregates them into rollout metrics.
+    """
+
+    percentiles = (50, 95, 99)
+
+    def __init__(self):
+        self.values: dict[str, list[float]] = defaultdict(list)
+
+    def reset(self):
+        self.values.clear()
+
+    def record(self, stage: str, value: float):
+        self.values[stage].append(value)
+
+    @contextmanager
+    def time(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    @asynccontextmanager
+    async def acquire(self, semaphore: asyncio.Semaphore, stage: str):
+        """
+        Acquires `semaphore` and records the time spent waiting for it.
+        """
+        start = time.perf_counter()
+        async with semaphore:
+            self.record(stage, time.perf_counter() - start)
+            yield
+
+    def collect(self, prefix: str = "rollout/timing") -> dict[str, float]:
+        metrics = {}
+        for stage, values in sorted(self.values.items()):
+            if not values:
+                continue
+            p = np.percentile(values, self.percentiles)
+            for q, v in zip(self.percentiles, p):
+                metrics[f"{prefix}/{stage}/p{q}"] = float(v)
+            metrics[f"{prefix}/{stage}/total"] = float(np.sum(values))
+            metrics[f"{prefix}/{stage}/count"] = len(values)
+        return metrics
+
+
+stage_timer = StageTimer()
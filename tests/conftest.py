@@ -0,0 +1,95 @@
+import asyncio
+from typing import Any
+from urllib.parse import urlparse
+
+import httpx
+import pytest
+from agents.mcp import MCPServer
+from mcp.types import CallToolResult, GetPromptResult, ListPromptsResult, TextContent
+from mcp.types import Tool as MCPTool
+
+from qqr.mcp.server import MCPServerCacheableMixin
+
+
+class FakeMCPServer(MCPServer):
+    """
+    In-memory MCP server whose tool returns `handler(arguments)`, counting the calls.
+    """
+
+    def __init__(self, handler=None, delay: float = 0.0):
+        super().__init__()
+        self.handler = handler or (lambda arguments: f"result: {arguments}")
+        self.delay = delay
+        self.calls: list[tuple[str, dict | None]] = []
+
+    @property
+    def name(self) -> str:
+        return "fake"
+
+    async def connect(self):
+        pass
+
+    async def cleanup(self):
+        pass
+
+    async def list_tools(self, *args, **kwargs) -> list[MCPTool]:
+        return []
+
+    async def call_tool(
+        self, tool_name: str, arguments: dict[str, Any] | None
+    ) -> CallToolResult:
+        self.calls.append((tool_name, arguments))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        output = self.handler(arguments)
+        if isinstance(output, CallToolResult):
+            return output
+        return CallToolResult(content=[TextContent(type="text", text=output)])
+
+    async def list_prompts(self) -> ListPromptsResult:
+        return ListPromptsResult(prompts=[])
+
+    async def get_prompt(self, name, arguments=None) -> GetPromptResult:
+        raise NotImplementedError
+
+
+class FakeMCPServerCacheable(MCPServerCacheableMixin, FakeMCPServer):
+    pass
+
+
+@pytest.fixture
+def make_server(monkeypatch):
+    """
+    Creates a cacheable fake server with in-process caches.
+    """
+    monkeypatch.setattr("qqr.mcp.server.MCP_CACHE_DIR", None)
+
+    def make_server(handler=None, delay: float = 0.0, **kwargs):
+        return FakeMCPServerCacheable(handler=handler, delay=delay, **kwargs)
+
+    return make_server
+
+
+@pytest.fixture
+def amap_api(monkeypatch):
+    """
+    Routes the AMap server's HTTP calls to `handler(path, params)`, which returns the JSON
+    response, and records the calls.
+    """
+    from qqr.tools.amap import server as amap
+
+    calls = []
+
+    def install(handler):
+        async def get(url: str, params: dict | None = None, **kwargs):
+            path = urlparse(url).path
+            calls.append((path, params))
+            return httpx.Response(
+                200, json=handler(path, params), request=httpx.Request("GET", url)
+            )
+
+        monkeypatch.setattr(amap.http_client, "get", get)
+        return calls
+
+    monkeypatch.setattr(amap, "poi_cache", type(amap.poi_cache)(maxsize=64, ttl=600))
+    return install
@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+
+from qqr.mcp.canonical import canonicalize_arguments
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "keywords": {"type": "string"},
+        "city": {"type": "string"},
+        "location": {"type": "string"},
+        "radius": {"type": "integer", "default": 1000},
+        "page": {"type": "integer"},
+    },
+    "required": ["keywords"],
+}
+
+
+def test_fills_defaults_and_drops_optional_nulls():
+    assert canonicalize_arguments({"keywords": "咖啡", "page": None}, SCHEMA) == {
+        "keywords": "咖啡",
+        "radius": 1000,
+    }
+    # Required arguments keep their nulls, so the tool can reject them.
+    assert canonicalize_arguments({"keywords": None}, SCHEMA) == {
+        "keywords": None,
+        "radius": 1000,
+    }
+
+
+def test_normalizes_strings():
+    assert canonicalize_arguments({"keywords": "  西湖\n 断桥 "}) == {
+        "keywords": "西湖 断桥"
+    }
+    # NFKC folds full-width characters.
+    assert canonicalize_arguments({"keywords": "ＫＦＣ　１号店"}) == {
+        "keywords": "KFC 1号店"
+    }
+
+
+@pytest.mark.parametrize(
+    "location, expected",
+    [
+        ("120.1550701,30.2740841", "120.15507,30.274084"),
+        (" 120.155070 , 30.274084 ", "120.15507,30.274084"),
+        ("120.0,30.5|121.25,31.0", "120,30.5|121.25,31"),
+        # Integer codes keep their leading zeros.
+        ("010", "010"),
+        # Free text is left alone apart from whitespace.
+        ("杭州市 西湖区 1.25 号", "杭州市 西湖区 1.25 号"),
+    ],
+)
+def test_rounds_decimals_in_numeric_strings(location, expected):
+    assert canonicalize_arguments({"location": location}) == {"location": expected}
+
+
+def test_rounds_numbers():
+    assert canonicalize_arguments(
+        {"lng": 120.15507012, "lat": 30.0, "n": 3, "ok": True}, precision=4
+    ) == {"lng": 120.1551, "lat": 30, "n": 3, "ok": True}
+
+
+def test_canonicalizes_nested_values():
+    schema = {
+        "type": "object",
+        "properties": {
+            "stops": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {"mode": {"type": "string", "default": "walk"}},
+                },
+            }
+        },
+    }
+    assert canonicalize_arguments(
+        {"stops": [{"location": "120.1000001, 30.2"}, {"mode": "bus"}]}, schema
+    ) == {"stops": [{"mode": "walk", "location": "120.1,30.2"}, {"mode": "bus"}]}
+
+
+def test_equivalent_calls_share_a_cache_entry(make_server):
+    server = make_server()
+    server.set_tool_schemas({"poi_search": SCHEMA})
+
+    async def main():
+        await server.call_tool(
+            "poi_search", {"keywords": "咖啡", "location": "120.155070,30.274084"}
+        )
+        await server.call_tool(
+            "poi_search",
+            {
+                "location": "120.15507, 30.274084",
+                "keywords": " 咖啡 ",
+                "radius": 1000,
+                "page": None,
+            },
+        )
+
+    asyncio.run(main())
+    assert len(server.calls) == 1
+    assert server.cache_stats["hits"] == 1
+
+
+def test_cache_key_normalizers(make_server):
+    server = make_server(
+        cache_key_normalizers={"poi_search": lambda args: {**args, "city": ""}}
+    )
+
+    async def main():
+        await server.call_tool("poi_search", {"keywords": "咖啡", "city": "杭州"})
+        await server.call_tool("poi_search", {"keywords": "咖啡", "city": "hangzhou"})
+        await server.call_tool("other", {"keywords": "咖啡", "city": "杭州"})
+        await server.call_tool("other", {"keywords": "咖啡", "city": "hangzhou"})
+
+    asyncio.run(main())
+    assert len(server.calls) == 3
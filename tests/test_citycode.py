@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from qqr.tools.amap.citycode import CityCodeResolver
+
+
+def make_resolver(answer: str | None = "API"):
+    calls = []
+
+    async def fallback(location: str) -> str | None:
+        calls.append(location)
+        return answer
+
+    return CityCodeResolver(fallback), calls
+
+
+@pytest.mark.parametrize(
+    "location, citycode",
+    [
+        ("116.397428,39.90923", "010"),
+        ("120.15507,30.274084", "0571"),
+        ("114.057868,22.543099", "0755"),
+    ],
+)
+def test_resolve_offline(location, citycode):
+    resolver, calls = make_resolver()
+    assert asyncio.run(resolver.resolve(location)) == citycode
+    assert calls == []
+
+
+@pytest.mark.parametrize(
+    "location",
+    [
+        # Macau, next to Zhuhai
+        "113.5439,22.1987",
+        # Zhongshan, not in the table
+        "113.46,22.26",
+        # Sha Tin, Hong Kong, next to Shenzhen
+        "114.19,22.38",
+        # Between Guangzhou and Foshan
+        "113.2,23.07",
+    ],
+)
+def test_resolve_outside_table_falls_back(location):
+    resolver, calls = make_resolver()
+    assert asyncio.run(resolver.resolve(location)) == "API"
+    assert calls == [location]
+
+
+def test_resolve_caches_fallback_results():
+    resolver, calls = make_resolver()
+
+    async def main():
+        return [
+            await resolver.resolve("113.5439,22.1987"),
+            await resolver.resolve("113.54390001,22.19870001"),
+        ]
+
+    assert asyncio.run(main()) == ["API", "API"]
+    assert calls == ["113.5439,22.1987"]
+
+
+def test_resolve_does_not_cache_missing_citycode():
+    resolver, calls = make_resolver(answer=None)
+
+    async def main():
+        return [
+            await resolver.resolve("100.0,40.0"),
+            await resolver.resolve("100.0,40.0"),
+        ]
+
+    assert asyncio.run(main()) == [None, None]
+    assert len(calls) == 2
+
+
+def test_resolve_invalid_location_falls_back():
+    resolver, calls = make_resolver()
+    assert asyncio.run(resolver.resolve("杭州西湖")) == "API"
+    assert calls == ["杭州西湖"]
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+
+def test_identical_concurrent_calls_run_once(make_server):
+    server = make_server(delay=0.05)
+
+    async def main():
+        return await asyncio.gather(
+            *(server.call_tool("weather", {"city": "杭州"}) for _ in range(5)),
+            server.call_tool("weather", {"city": "上海"}),
+        )
+
+    results = asyncio.run(main())
+    assert [r.content[0].text for r in results[:5]] == [results[0].content[0].text] * 5
+    assert len(server.calls) == 2
+    assert server.cache_stats["coalesced"] == 4
+    assert server._inflight_calls == {}
+
+
+def test_cancelled_follower_does_not_cancel_the_call(make_server):
+    server = make_server(delay=0.05)
+
+    async def main():
+        leader = asyncio.create_task(server.call_tool("weather", {"city": "杭州"}))
+        follower = asyncio.create_task(server.call_tool("weather", {"city": "杭州"}))
+        await asyncio.sleep(0.01)
+        follower.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+        return await leader
+
+    assert not asyncio.run(main()).isError
+    assert len(server.calls) == 1
+
+
+def test_follower_retries_when_the_leader_is_cancelled(make_server):
+    server = make_server(delay=0.05)
+
+    async def main():
+        leader = asyncio.create_task(server.call_tool("weather", {"city": "杭州"}))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(server.call_tool("weather", {"city": "杭州"}))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert not asyncio.run(main()).isError
+    assert len(server.calls) == 2
+    assert server.cache_stats["coalesced"] == 0
+    assert server._inflight_calls == {}
+
+
+def test_leader_exception_is_shared(make_server):
+    def handler(arguments):
+        raise RuntimeError("connection reset")
+
+    server = make_server(handler=handler, delay=0.05)
+
+    async def main():
+        return await asyncio.gather(
+            *(server.call_tool("weather", {"city": "杭州"}) for _ in range(3)),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert len(server.calls) == 1
+    assert server._inflight_calls == {}
+
+    # Exceptions are not cached.
+    asyncio.run(main())
+    assert len(server.calls) == 2
+
+
+def test_blocklisted_tools_are_not_coalesced(make_server):
+    server = make_server(delay=0.05, blocklist={"send_email"})
+
+    async def main():
+        await asyncio.gather(
+            *(server.call_tool("send_email", {"to": "a@b.c"}) for _ in range(3))
+        )
+
+    asyncio.run(main())
+    assert len(server.calls) == 3
@@ -0,0 +1,61 @@
+import asyncio
+import random
+import string
+
+from mcp.types import CallToolResult, TextContent
+
+from qqr.mcp.cache import CompressedToolResultCache
+
+
+def result(text: str) -> CallToolResult:
+    return CallToolResult(content=[TextContent(type="text", text=text)])
+
+
+def random_text(n: int) -> str:
+    rng = random.Random(n)
+    return "".join(rng.choices(string.ascii_letters, k=n))
+
+
+def test_round_trip_keeps_meta():
+    cache = CompressedToolResultCache()
+    cached = result("晴" * 100).model_copy(update={"meta": {"qqr/rendered": "晴"}})
+    asyncio.run(cache.set("weather:杭州", cached))
+
+    restored = asyncio.run(cache.get("weather:杭州"))
+    assert restored == cached
+    assert restored.meta == {"qqr/rendered": "晴"}
+    # Repetitive results compress well below their JSON size.
+    assert cache.currsize < len(cached.model_dump_json(by_alias=True).encode())
+
+
+def test_bounded_by_compressed_bytes():
+    cache = CompressedToolResultCache(max_bytes=16 * 1024)
+
+    async def main():
+        for i in range(32):
+            await cache.set(f"key:{i}", result(random_text(1024)))
+
+    asyncio.run(main())
+    assert 0 < cache.currsize <= 16 * 1024
+    assert asyncio.run(cache.get("key:0")) is None
+    assert asyncio.run(cache.get("key:31")) is not None
+
+
+def test_results_larger_than_budget_are_not_cached():
+    cache = CompressedToolResultCache(max_bytes=1024)
+    asyncio.run(cache.set("key", result(random_text(4096))))
+    assert asyncio.run(cache.get("key")) is None
+    assert cache.currsize == 0
+
+
+def test_server_uses_compressed_cache_with_byte_budget(make_server):
+    server = make_server(cache_max_bytes=1 << 20)
+
+    async def main():
+        for _ in range(3):
+            await server.call_tool("weather", {"city": "杭州"})
+
+    asyncio.run(main())
+    assert isinstance(server._tool_cache, CompressedToolResultCache)
+    assert isinstance(server._negative_cache, CompressedToolResultCache)
+    assert len(server.calls) == 1
@@ -0,0 +1,95 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from qqr.rollout import agent_rollout
+from qqr.schemas import Sample
+
+
+@pytest.fixture
+def eval_dataset(monkeypatch):
+    """
+    Runs `eval_rollout_single_dataset` on `num_prompts` prompts, with `generate_and_rm`
+    replaced by `reward_fn(index) -> reward`.
+    """
+    monkeypatch.setattr(agent_rollout, "EVAL_PROMPT_DATASET", {})
+    monkeypatch.setattr(agent_rollout, "EVAL_CONCURRENCY", 2)
+    monkeypatch.setattr(agent_rollout, "load_tokenizer", lambda *args, **kwargs: None)
+    monkeypatch.setattr(agent_rollout, "load_processor", lambda *args, **kwargs: None)
+    monkeypatch.setattr(agent_rollout, "GenerateState", lambda args: None)
+
+    def run_eval(num_prompts: int, reward_fn) -> dict:
+        monkeypatch.setattr(
+            agent_rollout,
+            "Dataset",
+            lambda **kwargs: SimpleNamespace(
+                samples=[Sample(prompt=str(i)) for i in range(num_prompts)]
+            ),
+        )
+
+        async def generate_and_rm(args, sample, sampling_params, evaluation=False):
+            await asyncio.sleep(0.001 * (num_prompts - sample.index))
+            sample.reward = {"score": reward_fn(sample.index)}
+            sample.status = Sample.Status.COMPLETED
+            return sample
+
+        monkeypatch.setattr(agent_rollout, "generate_and_rm", generate_and_rm)
+
+        args = SimpleNamespace(
+            hf_checkpoint="model",
+            apply_chat_template=True,
+            apply_chat_template_kwargs={},
+            eval_max_prompt_len=None,
+            eval_max_context_len=None,
+            multimodal_keys=None,
+            rollout_stop=None,
+            rollout_stop_token_ids=None,
+            rollout_skip_special_tokens=False,
+            eval_reward_key="score",
+            reward_key=None,
+        )
+        dataset_cfg = SimpleNamespace(
+            name="travel",
+            cache_key=("travel",),
+            path="travel.jsonl",
+            input_key="prompt",
+            label_key=None,
+            metadata_key=None,
+            tool_key=None,
+            temperature=0.0,
+            top_p=1.0,
+            top_k=-1,
+            max_response_len=16,
+            n_samples_per_eval_prompt=1,
+            inject_metadata=lambda metadata: metadata,
+        )
+        output = asyncio.run(
+            agent_rollout.eval_rollout_single_dataset(args, 0, dataset_cfg)
+        )
+        return output["travel"]
+
+    return run_eval
+
+
+def test_samples_are_returned_in_order_when_written_to_disk(
+    eval_dataset, monkeypatch, tmp_path
+):
+    monkeypatch.setattr(agent_rollout, "EVAL_OUTPUT_DIR", str(tmp_path))
+
+    output = eval_dataset(4, reward_fn=float)
+    assert output["rewards"] == [0.0, 1.0, 2.0, 3.0]
+    assert [sample.index for sample in output["samples"]] == [0, 1, 2, 3]
+
+    lines = (tmp_path / "travel" / "rollout_0.jsonl").read_text().splitlines()
+    assert sorted(json.loads(line)["index"] for line in lines) == [0, 1, 2, 3]
+
+
+def test_samples_without_reward_are_left_out(eval_dataset, monkeypatch):
+    monkeypatch.setattr(agent_rollout, "EVAL_OUTPUT_DIR", None)
+
+    output = eval_dataset(4, reward_fn=lambda index: None if index == 2 else 1.0)
+    assert output["rewards"] == [1.0, 1.0, 1.0]
+    assert output["truncated"] == [False, False, False]
+    assert [sample.index for sample in output["samples"]] == [0, 1, 3]
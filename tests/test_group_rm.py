@@ -0,0 +1,36 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from qqr.rollout import agent_rollout
+
+
+def test_streaming_rm_is_cancelled_when_generation_fails(monkeypatch):
+    rm_cancelled = asyncio.Event()
+
+    async def generate_and_rm(args, sample, sampling_params, evaluation=False):
+        await asyncio.sleep(0)
+        raise RuntimeError("generation failed")
+
+    async def streaming_group_rm(args, group, tasks):
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            rm_cancelled.set()
+            raise
+
+    monkeypatch.setattr(agent_rollout, "STREAMING_GROUP_RM_PATH", "streaming_group_rm")
+    monkeypatch.setattr(agent_rollout, "load_function", lambda path: streaming_group_rm)
+    monkeypatch.setattr(agent_rollout, "generate_and_rm", generate_and_rm)
+    monkeypatch.setattr(
+        agent_rollout, "GenerateState", lambda args: SimpleNamespace(aborted=False)
+    )
+    args = SimpleNamespace(group_rm=True)
+
+    async def main():
+        with pytest.raises(RuntimeError, match="generation failed"):
+            await agent_rollout.generate_and_rm_group(args, [object(), object()], {})
+        return rm_cancelled.is_set()
+
+    assert asyncio.run(main())
@@ -0,0 +1,188 @@
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+tokenizers = pytest.importorskip("tokenizers")
+transformers = pytest.importorskip("transformers")
+
+from qqr.rollout.agent_rollout import GenerateState  # noqa: E402
+
+CHAT_TEMPLATE_PATH = Path(__file__).with_name("qwen3_chat_template.jinja")
+
+SPECIAL_TOKENS = ["<|endoftext|>", "<|im_start|>", "<|im_end|>"]
+ADDED_TOKENS = [
+    "<think>",
+    "</think>",
+    "<tool_call>",
+    "</tool_call>",
+    "<tool_response>",
+    "</tool_response>",
+]
+
+TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "weather",
+            "description": "Get the weather of a city.",
+            "parameters": {
+                "type": "object",
+                "properties": {"city": {"type": "string"}},
+                "required": ["city"],
+            },
+        },
+    }
+]
+
+
+@pytest.fixture(scope="module")
+def tokenizer():
+    """
+    A small byte-level BPE tokenizer with the Qwen3 special tokens and chat template.
+    """
+    from tokenizers import Tokenizer, decoders, models, pre_tokenizers, trainers
+    from transformers import PreTrainedTokenizerFast
+
+    backend = Tokenizer(models.BPE())
+    backend.pre_tokenizer = pre_tokenizers.ByteLevel(add_prefix_space=False)
+    backend.decoder = decoders.ByteLevel()
+    trainer = trainers.BpeTrainer(
+        vocab_size=600,
+        special_tokens=SPECIAL_TOKENS,
+        initial_alphabet=pre_tokenizers.ByteLevel.alphabet(),
+    )
+    corpus = [
+        CHAT_TEMPLATE_PATH.read_text(encoding="utf-8"),
+        json.dumps(TOOLS, ensure_ascii=False),
+        "The weather in Hangzhou is sunny. 杭州今天晴，气温 25 度。",
+    ]
+    backend.train_from_iterator(corpus, trainer)
+
+    tokenizer = PreTrainedTokenizerFast(
+        tokenizer_object=backend,
+        eos_token="<|im_end|>",
+        pad_token="<|endoftext|>",
+        additional_special_tokens=SPECIAL_TOKENS[1:],
+    )
+    tokenizer.add_tokens(ADDED_TOKENS)
+    tokenizer.chat_template = CHAT_TEMPLATE_PATH.read_text(encoding="utf-8")
+    return tokenizer
+
+
+def tool_call_text(city: str) -> str:
+    arguments = json.dumps({"city": city}, ensure_ascii=False)
+    return f'<tool_call>\n{{"name": "weather", "arguments": {arguments}}}\n</tool_call>'
+
+
+def render(tokenizer, messages: list[dict]) -> list[int]:
+    text = tokenizer.apply_chat_template(
+        messages, tools=TOOLS, tokenize=False, add_generation_prompt=True
+    )
+    return tokenizer.encode(text, add_special_tokens=False)
+
+
+def run_agent_loop(tokenizer, turns: list[tuple[str, list[dict]]]):
+    """
+    Replays the agent loop: each turn appends the generated response to the tokens, then
+    incrementally encodes the messages that follow it and compares the prompt with a full
+    render of the conversation.
+    """
+    state = SimpleNamespace(tokenizer=tokenizer)
+    sample = SimpleNamespace(
+        messages=[
+            {"role": "system", "content": "You are a travel assistant."},
+            {"role": "user", "content": "杭州和上海今天天气怎么样？"},
+        ],
+        tokens=[],
+        num_tokenized_messages=0,
+    )
+    sample.tokens = render(tokenizer, sample.messages)
+
+    for response, new_messages in turns:
+        sample.tokens = sample.tokens + tokenizer.encode(
+            response, add_special_tokens=False
+        )
+        sample.messages.append(
+            {"role": "assistant", "content": response.removesuffix("<|im_end|>")}
+        )
+        sample.num_tokenized_messages = len(sample.messages)
+        sample.messages.extend(new_messages)
+
+        prompt_ids = sample.tokens + GenerateState.encode_new_messages(state, sample)
+        assert prompt_ids == render(tokenizer, sample.messages)
+        sample.tokens = prompt_ids
+
+
+def test_incremental_tool_call_turns(tokenizer):
+    run_agent_loop(
+        tokenizer,
+        [
+            (
+                "<think>\nCheck both cities.\n</think>\n\n"
+                + tool_call_text("杭州")
+                + "\n"
+                + tool_call_text("上海")
+                + "<|im_end|>",
+                [
+                    {"role": "tool", "content": "晴，25 度", "tool_call_id": "call_1"},
+                    {
+                        "role": "tool",
+                        "content": "多云，22 度",
+                        "tool_call_id": "call_2",
+                    },
+                ],
+            ),
+            (
+                "<think>\nCheck Hangzhou again.\n</think>\n\n"
+                + tool_call_text("杭州")
+                + "<|im_end|>",
+                [{"role": "tool", "content": "晴，26 度", "tool_call_id": "call_1"}],
+            ),
+        ],
+    )
+
+
+def test_incremental_multi_turn_with_system_messages(tokenizer):
+    # The agent loop appends a system message with the remaining steps to every turn.
+    run_agent_loop(
+        tokenizer,
+        [
+            (
+                tool_call_text("杭州") + "<|im_end|>",
+                [
+                    {"role": "tool", "content": "晴，25 度", "tool_call_id": "call_1"},
+                    {"role": "system", "content": "Step 2 of 3."},
+                ],
+            ),
+            (
+                "Let me also check Shanghai.\n" + tool_call_text("上海") + "<|im_end|>",
+                [
+                    {
+                        "role": "tool",
+                        "content": "多云，22 度",
+                        "tool_call_id": "call_1",
+                    },
+                    {"role": "system", "content": "Step 3 of 3."},
+                ],
+            ),
+            (
+                "Which day do you plan to travel?<|im_end|>",
+                [{"role": "user", "content": "明天。"}],
+            ),
+        ],
+    )
+
+
+def test_incremental_after_response_without_eos(tokenizer):
+    # A response cut off by the stop string misses the end-of-turn token.
+    run_agent_loop(
+        tokenizer,
+        [
+            (
+                "<think>\nCheck Hangzhou.\n</think>\n\n" + tool_call_text("杭州"),
+                [{"role": "tool", "content": "晴，25 度", "tool_call_id": "call_1"}],
+            ),
+        ],
+    )
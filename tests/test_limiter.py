@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from qqr.mcp.limiter import AdaptiveLimiter
+
+
+def test_limit_increases_on_success():
+    limiter = AdaptiveLimiter(initial_limit=4, max_limit=8)
+    for _ in range(100):
+        limiter.record(0.1)
+    assert limiter.limit == 8
+
+
+def test_limit_decreases_on_congestion():
+    limiter = AdaptiveLimiter(initial_limit=16, min_limit=2)
+    limiter.record(0.0, congested=True)
+    assert limiter.limit == 8
+
+    # Backs off at most once per smoothed latency.
+    limiter.smoothed_latency[""] = 60.0
+    limiter.record(0.0, congested=True)
+    assert limiter.limit == 8
+
+    limiter.smoothed_latency[""] = 0.0
+    for _ in range(10):
+        limiter.record(0.0, congested=True)
+    assert limiter.limit == 2
+
+
+def test_limit_decreases_on_latency_increase():
+    limiter = AdaptiveLimiter(initial_limit=16, latency_tolerance=3.0)
+    limiter.record(0.01)
+    limit = limiter.limit
+    for _ in range(50):
+        limiter.record(1.0)
+    assert limiter.limit < limit
+
+
+def test_latency_is_tracked_per_tool():
+    limiter = AdaptiveLimiter(initial_limit=4, max_limit=16)
+    for _ in range(200):
+        limiter.record(0.01, key="weather")
+        limiter.record(2.0, key="transit_direction")
+    assert limiter.limit == 16
+
+
+def test_exception_counts_as_congestion():
+    limiter = AdaptiveLimiter(initial_limit=8)
+
+    async def main():
+        with pytest.raises(RuntimeError):
+            async with limiter:
+                raise RuntimeError
+
+    asyncio.run(main())
+    assert limiter.limit == 4
+    assert limiter.inflight == 0
+
+
+def test_concurrency_is_bounded_by_limit():
+    limiter = AdaptiveLimiter(initial_limit=3, max_limit=3)
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        async with limiter:
+            peak = max(peak, limiter.inflight)
+            await asyncio.sleep(0.01)
+
+    async def main():
+        await asyncio.gather(*(call() for _ in range(20)))
+
+    asyncio.run(main())
+    assert peak == 3
+    assert limiter.inflight == 0 and limiter.waiting == 0
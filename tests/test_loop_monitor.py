@@ -0,0 +1,37 @@
+import asyncio
+import logging
+import time
+
+from qqr.utils.loop_monitor import LoopMonitor
+
+
+async def block(seconds: float):
+    time.sleep(seconds)
+    await asyncio.sleep(0)
+
+
+def test_slow_callbacks_are_logged_with_fixed_metric_keys(caplog):
+    monitor = LoopMonitor(interval=0.01, slow_callback_ms=5, top_k=5)
+
+    async def main():
+        monitor.start()
+        await asyncio.gather(*(block(0.01) for _ in range(3)))
+        await asyncio.sleep(0.02)
+
+    asyncio.run(main())
+    with caplog.at_level(logging.INFO, logger="qqr.utils.loop_monitor"):
+        metrics = monitor.collect(prefix="loop")
+
+    assert metrics["loop/slow_callbacks"] >= 3
+    assert metrics["loop/slow_callback/max"] >= 0.01
+    assert set(metrics) == {
+        "loop/lag/p50",
+        "loop/lag/p95",
+        "loop/lag/p99",
+        "loop/lag/max",
+        "loop/slow_callbacks",
+        "loop/slow_callback/total",
+        "loop/slow_callback/p99",
+        "loop/slow_callback/max",
+    }
+    assert "Slow event loop callback block:" in caplog.text
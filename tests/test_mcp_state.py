@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+from mcp.server.fastmcp import FastMCP
+
+from qqr.mcp import MCPServerInProcess
+from qqr.rollout.agent_rollout import MCPState
+
+
+def make_fastmcp(name: str) -> FastMCP:
+    mcp = FastMCP(name, log_level="WARNING")
+
+    @mcp.tool(name=f"{name}_echo")
+    async def echo(text: str) -> str:
+        return text
+
+    return mcp
+
+
+@pytest.fixture
+def mcp_state(monkeypatch):
+    monkeypatch.setattr("qqr.rollout.agent_rollout.MCP_REPLAY_PATH", None)
+    monkeypatch.setattr(MCPState, "current", None)
+
+    def make_state(servers):
+        state = object.__new__(MCPState)
+        MCPState.__init__(state, lambda: servers)
+        return state
+
+    return make_state
+
+
+def test_servers_can_be_cleaned_up_by_the_connecting_task(mcp_state, caplog):
+    servers = [MCPServerInProcess(make_fastmcp(name)) for name in ("a", "b")]
+    state = mcp_state(servers)
+
+    async def main():
+        await state.get_mcp_servers()
+        result = await state.tool_to_server["b_echo"].call_tool(
+            "b_echo", {"text": "hi"}
+        )
+        for server in reversed(servers):
+            await server.cleanup()
+        return result
+
+    assert asyncio.run(main()).content[0].text == "hi"
+    assert [tool["function"]["name"] for tool in state.tools] == ["a_echo", "b_echo"]
+    # Cleanup logs instead of raising when a cancel scope is exited in another task.
+    assert "Error cleaning up server" not in caplog.text
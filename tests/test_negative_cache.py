@@ -0,0 +1,102 @@
+import asyncio
+import time
+
+import pytest
+from mcp.types import CallToolResult, TextContent
+
+from qqr.mcp.cache import ErrorClassifier
+
+
+def error(text: str) -> CallToolResult:
+    return CallToolResult(content=[TextContent(type="text", text=text)], isError=True)
+
+
+@pytest.mark.parametrize(
+    "text, deterministic, transient",
+    [
+        ("No POI data available for 火星", True, False),
+        ("INVALID_PARAMS", True, False),
+        ("Request timed out", False, True),
+        ("HTTP 429: Too Many Requests", False, True),
+        ("No route available (502 Bad Gateway)", False, True),
+        ("Something went wrong", False, False),
+    ],
+)
+def test_error_classifier(text, deterministic, transient):
+    classifier = ErrorClassifier()
+    assert classifier(error(text)) is deterministic
+    assert classifier.is_transient(error(text)) is transient
+
+
+def test_success_is_not_an_error():
+    classifier = ErrorClassifier()
+    result = CallToolResult(content=[TextContent(type="text", text="timed out")])
+    assert classifier(result) is False
+    assert classifier.is_transient(result) is False
+
+
+def call_twice(server, arguments: dict):
+    async def main():
+        return [await server.call_tool("poi_search", arguments) for _ in range(2)]
+
+    return asyncio.run(main())
+
+
+def test_deterministic_errors_are_cached(make_server):
+    server = make_server(handler=lambda arguments: error("No POI data available"))
+    results = call_twice(server, {"keywords": "火星"})
+
+    assert all(result.isError for result in results)
+    assert len(server.calls) == 1
+    assert server.cache_stats["negative_hits"] == 1
+    # Errors never go to the result cache.
+    key = server._make_cache_key("poi_search", {"keywords": "火星"})
+    assert asyncio.run(server._tool_cache.get(key)) is None
+
+
+@pytest.mark.parametrize("text", ["Request timed out", "Something went wrong"])
+def test_other_errors_are_not_cached(make_server, text):
+    server = make_server(handler=lambda arguments: error(text))
+    call_twice(server, {"keywords": "火星"})
+    assert len(server.calls) == 2
+
+
+def test_negative_cache_can_be_disabled(make_server):
+    server = make_server(
+        handler=lambda arguments: error("No POI data available"),
+        negative_cache_ttl=0,
+    )
+    call_twice(server, {"keywords": "火星"})
+    assert len(server.calls) == 2
+
+
+def test_negative_cache_expires_before_result_cache(make_server):
+    responses = iter([error("No POI data available"), "ok", "ok again"])
+    server = make_server(
+        handler=lambda arguments: next(responses),
+        cache_ttl=600,
+        negative_cache_ttl=60,
+    )
+
+    async def call():
+        result = await server.call_tool("poi_search", {"keywords": "西湖"})
+        return result.content[0].text
+
+    def expire(ttl: float):
+        # Evict the entries that would have expired after `ttl` seconds.
+        now = time.monotonic() + ttl + 1
+        server._negative_cache._cache.expire(now)
+        server._tool_cache._cache.expire(now)
+
+    assert asyncio.run(call()) == "No POI data available"
+    assert asyncio.run(call()) == "No POI data available"
+    assert len(server.calls) == 1
+
+    expire(60)
+    assert asyncio.run(call()) == "ok"
+    assert len(server.calls) == 2
+
+    # The successful result outlives the negative cache TTL.
+    expire(60)
+    assert asyncio.run(call()) == "ok"
+    assert len(server.calls) == 2
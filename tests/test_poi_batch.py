@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from qqr.tools.amap import server as amap
+
+POIS = {
+    "西湖": [
+        {"id": "B1", "name": "西湖", "location": "120.14,30.25"},
+        {"id": "B2", "name": "断桥", "location": "120.15,30.26"},
+    ],
+    "断桥": [{"id": "B2", "name": "断桥", "location": "120.15,30.26"}],
+    "灵隐寺": [{"id": "B3", "name": "灵隐寺", "location": "120.10,30.24"}],
+}
+
+
+def poi_response(path: str, params: dict) -> dict:
+    pois = POIS.get(params["keywords"])
+    if pois is None:
+        return {"status": "1", "pois": []}
+    return {"status": "1", "pois": pois}
+
+
+def test_poi_search_batch_merges_results(amap_api):
+    calls = amap_api(poi_response)
+
+    text = asyncio.run(
+        amap.poi_search(["西湖", "断桥", "灵隐寺", "西湖"], region="杭州")
+    )
+    assert len(calls) == 3
+    assert all(params["region"] == "杭州" for _, params in calls)
+    assert text.count("name: 断桥") == 1
+    assert "**Query: 断桥**\n结果均已在上文列出。" in text
+    assert "name: 灵隐寺" in text
+
+
+def test_poi_search_batch_reports_failed_queries(amap_api):
+    amap_api(poi_response)
+
+    text = asyncio.run(amap.poi_search(["西湖", "火星"]))
+    assert "name: 西湖" in text
+    assert "Query '火星': Error - No POI data available." in text
+
+    with pytest.raises(Exception, match="No POI data available"):
+        asyncio.run(amap.poi_search(["火星", "月球"]))
+    with pytest.raises(Exception, match="1 to 10 queries"):
+        asyncio.run(amap.poi_search([]))
+
+
+def test_poi_search_shares_cache_with_batches(amap_api):
+    calls = amap_api(poi_response)
+
+    asyncio.run(amap.poi_search("西湖"))
+    asyncio.run(amap.poi_search(["西湖", "灵隐寺"]))
+    assert [params["keywords"] for _, params in calls] == ["西湖", "灵隐寺"]
+
+
+def test_around_search_batch(amap_api):
+    calls = amap_api(poi_response)
+
+    text = asyncio.run(
+        amap.around_search("120.15,30.25", radius=1000, keyword=["西湖", "灵隐寺"])
+    )
+    assert len(calls) == 2
+    assert all(path == "/v5/place/around" for path, _ in calls)
+    assert all(params["location"] == "120.15,30.25" for _, params in calls)
+    assert "name: 灵隐寺" in text
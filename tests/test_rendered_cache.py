@@ -0,0 +1,66 @@
+import asyncio
+
+from qqr.mcp.server import RENDERED_META_KEY
+
+
+def render(result):
+    render.calls += 1
+    return result.content[0].text.upper()
+
+
+def test_rendered_content_is_stored_with_result(make_server):
+    server = make_server(cache_max_bytes=1 << 20)
+    render.calls = 0
+
+    async def main():
+        return [
+            await server.call_tool_rendered("echo", {"text": "a"}, render=render)
+            for _ in range(3)
+        ]
+
+    assert asyncio.run(main()) == ["RESULT: {'TEXT': 'A'}"] * 3
+    assert render.calls == 1
+    assert len(server.calls) == 1
+
+    cached = asyncio.run(
+        server._tool_cache.get(server._make_cache_key("echo", {"text": "a"}))
+    )
+    assert cached.meta[f"{RENDERED_META_KEY}/default"] == "RESULT: {'TEXT': 'A'}"
+
+
+def test_plain_results_are_rendered_on_hit(make_server):
+    server = make_server()
+    render.calls = 0
+
+    async def main():
+        await server.call_tool("echo", {"text": "a"})
+        return await server.call_tool_rendered("echo", {"text": "a"}, render=render)
+
+    assert asyncio.run(main()) == "RESULT: {'TEXT': 'A'}"
+    assert render.calls == 1
+    assert len(server.calls) == 1
+
+
+def test_renders_are_not_shared_across_modes(make_server, monkeypatch, tmp_path):
+    # The on-disk cache is shared by runs that may render tool messages differently.
+    monkeypatch.setattr("qqr.mcp.server.MCP_CACHE_DIR", str(tmp_path))
+    full = make_server()
+    compact = make_server()
+
+    def render_compact(result):
+        return result.content[0].text.lower()
+
+    async def main():
+        return [
+            await full.call_tool_rendered(
+                "echo", {"text": "A"}, render=render, render_mode="full"
+            ),
+            await compact.call_tool_rendered(
+                "echo", {"text": "A"}, render=render_compact, render_mode="compact"
+            ),
+        ]
+
+    render.calls = 0
+    assert asyncio.run(main()) == ["RESULT: {'TEXT': 'A'}", "result: {'text': 'a'}"]
+    assert len(full.calls) == 1
+    assert len(compact.calls) == 0
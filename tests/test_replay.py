@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+from agents.exceptions import UserError
+from mcp.types import CallToolResult, TextContent
+
+from qqr.mcp.replay import MCPServerReplay, ToolCallRecorder, make_replay_key
+
+TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "echo",
+            "description": "Echo.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "text": {"type": "string"},
+                    "upper": {"type": "boolean", "default": False},
+                },
+                "required": ["text"],
+            },
+        },
+    }
+]
+
+
+def text_result(text: str) -> CallToolResult:
+    return CallToolResult(content=[TextContent(type="text", text=text)])
+
+
+def record(path, calls):
+    recorder = ToolCallRecorder(path)
+
+    async def main():
+        await recorder.record_tools("echo_server", TOOLS)
+        for arguments, text in calls:
+            await recorder.record_call(
+                "echo_server",
+                "echo",
+                arguments,
+                key=make_replay_key(
+                    "echo", arguments, TOOLS[0]["function"]["parameters"]
+                ),
+                result=text_result(text),
+                latency=0.01,
+            )
+
+    asyncio.run(main())
+
+
+def test_replay_returns_recorded_results_in_order(tmp_path):
+    path = tmp_path / "archive.jsonl"
+    record(path, [({"text": "a"}, "first"), ({"text": "a"}, "second")])
+
+    (server,) = MCPServerReplay.from_archive(path)
+    assert server.name == "echo_server"
+
+    async def main():
+        tools = await server.list_tools()
+        results = [
+            await server.call_tool("echo", {"text": "a"}),
+            # Canonicalized like cache keys: defaults and whitespace do not matter.
+            await server.call_tool("echo", {"text": " a ", "upper": False}),
+            await server.call_tool("echo", {"text": "a"}),
+        ]
+        return tools, results
+
+    tools, results = asyncio.run(main())
+    assert [tool.name for tool in tools] == ["echo"]
+    assert [result.content[0].text for result in results] == [
+        "first",
+        "second",
+        "second",
+    ]
+
+
+def test_replay_unrecorded_call_is_error(tmp_path):
+    path = tmp_path / "archive.jsonl"
+    record(path, [({"text": "a"}, "first")])
+    (server,) = MCPServerReplay.from_archive(path)
+
+    result = asyncio.run(server.call_tool("echo", {"text": "b"}))
+    assert result.isError
+
+
+def test_replay_get_prompt_raises_user_error(tmp_path):
+    path = tmp_path / "archive.jsonl"
+    record(path, [])
+    (server,) = MCPServerReplay.from_archive(path)
+
+    with pytest.raises(UserError):
+        asyncio.run(server.get_prompt("prompt"))
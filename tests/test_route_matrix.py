@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from qqr.tools.amap import server as amap
+
+
+def route_response(path: str, params: dict) -> dict:
+    if params["destination"] == "0,0":
+        return {"status": "1", "route": {}}
+    distance = 1000 * (len(params["origin"]) + len(params["destination"]))
+    return {
+        "status": "1",
+        "route": {
+            "paths": [{"distance": str(distance), "cost": {"duration": "600"}}],
+            "transits": [
+                {
+                    "distance": str(distance),
+                    "cost": {"duration": "1200", "transit_fee": "4"},
+                }
+            ],
+        },
+    }
+
+
+def test_route_matrix_itinerary(amap_api):
+    calls = amap_api(route_response)
+    points = ["120.1,30.2", "120.15,30.25", "120.2,30.3"]
+
+    text = asyncio.run(amap.route_matrix(points))
+    assert len(calls) == 2
+    assert all(path == "/v5/direction/driving" for path, _ in calls)
+    assert "| P1 | P2 | 22.0 | 10 |" in text
+    assert "| P2 | P3 | 22.0 | 10 |" in text
+    assert "合计: 44.0 公里, 20 分钟" in text
+
+
+def test_route_matrix_all_pairs(amap_api):
+    calls = amap_api(route_response)
+    points = ["120.1,30.2", "120.15,30.25", "120.2,30.3", "120.25,30.35"]
+
+    text = asyncio.run(amap.route_matrix(points, itinerary=False))
+    assert len(calls) == 6
+    assert "| P1 | P4 |" in text
+    assert "合计" not in text
+
+
+def test_route_matrix_transit_fare(amap_api, monkeypatch):
+    amap_api(route_response)
+
+    async def resolve(location: str) -> str:
+        return "0571"
+
+    monkeypatch.setattr(amap.citycode_resolver, "resolve", resolve)
+
+    text = asyncio.run(amap.route_matrix(["120.1,30.2", "120.2,30.3"], mode="transit"))
+    assert "票价(元)" in text
+    assert "| P1 | P2 | 20.0 | 20 | 4 |" in text
+
+
+def test_route_matrix_reports_failed_legs(amap_api):
+    amap_api(route_response)
+
+    text = asyncio.run(amap.route_matrix(["120.1,30.2", "0,0", "120.2,30.3"]))
+    assert "| P1 | P2 | 无路线: No route available. |" in text
+    assert "| P2 | P3 | 13.0 | 10 |" in text
+    assert "(不含无路线的路段)" in text
+
+
+def test_route_matrix_errors(amap_api):
+    amap_api(route_response)
+
+    with pytest.raises(Exception, match="No route available"):
+        asyncio.run(amap.route_matrix(["120.1,30.2", "0,0"]))
+    with pytest.raises(Exception, match="2 to 10 points"):
+        asyncio.run(amap.route_matrix(["120.1,30.2"]))
+    with pytest.raises(Exception, match="2 to 6 points"):
+        asyncio.run(amap.route_matrix(["120.1,30.2"] * 7, itinerary=False))
+
+
+def test_route_matrix_keeps_the_cause_of_failed_legs(amap_api):
+    amap_api(
+        lambda path, params: {"status": "0", "info": "CUQPS_HAS_EXCEEDED_THE_LIMIT"}
+    )
+
+    with pytest.raises(Exception, match="CUQPS_HAS_EXCEEDED_THE_LIMIT"):
+        asyncio.run(amap.route_matrix(["120.1,30.2", "120.2,30.3"]))
+
+
+def test_route_matrix_rejects_unsupported_mode(amap_api):
+    calls = amap_api(route_response)
+
+    with pytest.raises(Exception, match="Unsupported mode: flying"):
+        asyncio.run(amap.route_matrix(["120.1,30.2", "120.2,30.3"], mode="flying"))
+    assert calls == []
@@ -0,0 +1,86 @@
+import asyncio
+
+from mcp.types import CallToolResult, TextContent
+
+from qqr.mcp.cache import SQLiteToolResultCache
+
+
+def result(text: str) -> CallToolResult:
+    return CallToolResult(content=[TextContent(type="text", text=text)])
+
+
+def get_text(cache: SQLiteToolResultCache, key: str) -> str | None:
+    cached = asyncio.run(cache.get(key))
+    return cached.content[0].text if cached is not None else None
+
+
+def test_entries_are_shared_through_the_file(tmp_path):
+    path = tmp_path / "tool_results.sqlite"
+    writer = SQLiteToolResultCache(path, namespace="amap")
+    reader = SQLiteToolResultCache(path, namespace="amap")
+    other = SQLiteToolResultCache(path, namespace="search")
+
+    asyncio.run(writer.set("weather:杭州", result("晴")))
+    assert get_text(reader, "weather:杭州") == "晴"
+    assert get_text(other, "weather:杭州") is None
+
+
+def test_meta_survives_round_trip(tmp_path):
+    cache = SQLiteToolResultCache(tmp_path / "tool_results.sqlite")
+    cached = result("晴").model_copy(update={"meta": {"qqr/rendered": "晴"}})
+    asyncio.run(cache.set("weather:杭州", cached))
+    assert asyncio.run(cache.get("weather:杭州")).meta == {"qqr/rendered": "晴"}
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = SQLiteToolResultCache(tmp_path / "tool_results.sqlite", ttl=0)
+    asyncio.run(cache.set("weather:杭州", result("晴")))
+    assert get_text(cache, "weather:杭州") is None
+
+
+def test_prune_keeps_maxsize_entries(tmp_path):
+    cache = SQLiteToolResultCache(tmp_path / "tool_results.sqlite", maxsize=4)
+    cache.prune_interval = 1000
+
+    async def main():
+        for i in range(10):
+            await cache.set(f"key:{i}", result(str(i)))
+
+    asyncio.run(main())
+    cache._prune()
+    # The entries closest to expiry, i.e. the oldest, are evicted first.
+    texts = [get_text(cache, f"key:{i}") for i in range(10)]
+    assert texts[6:] == ["6", "7", "8", "9"]
+    assert texts[:6] == [None] * 6
+
+
+def test_warm_start_imports_unexpired_entries(tmp_path):
+    previous = SQLiteToolResultCache(tmp_path / "previous.sqlite", namespace="amap")
+    asyncio.run(previous.set("weather:杭州", result("晴")))
+    expired = SQLiteToolResultCache(
+        tmp_path / "previous.sqlite", namespace="amap", ttl=0
+    )
+    asyncio.run(expired.set("weather:上海", result("雨")))
+
+    cache = SQLiteToolResultCache(
+        tmp_path / "tool_results.sqlite",
+        namespace="amap",
+        warm_start_path=tmp_path / "previous.sqlite",
+    )
+    assert get_text(cache, "weather:杭州") == "晴"
+    assert get_text(cache, "weather:上海") is None
+
+
+def test_server_uses_sqlite_cache_in_cache_dir(make_server, monkeypatch, tmp_path):
+    monkeypatch.setattr("qqr.mcp.server.MCP_CACHE_DIR", str(tmp_path))
+    first = make_server()
+    second = make_server()
+
+    async def main():
+        await first.call_tool("weather", {"city": "杭州"})
+        await second.call_tool("weather", {"city": "杭州"})
+
+    asyncio.run(main())
+    assert isinstance(first._tool_cache, SQLiteToolResultCache)
+    assert len(first.calls) == 1
+    assert len(second.calls) == 0
@@ -0,0 +1,43 @@
+import asyncio
+
+from conftest import FakeMCPServer
+
+from qqr.mcp.server import MCPServerStdioPool
+
+
+def make_pool(num_replicas: int, delay: float = 0.05) -> MCPServerStdioPool:
+    pool = MCPServerStdioPool(
+        params={"command": "true"}, num_replicas=num_replicas, name="pool"
+    )
+    # Replicas are only spawned on `connect`, so they can be swapped for fakes.
+    pool.replicas = [FakeMCPServer(delay=delay) for _ in range(num_replicas)]
+    return pool
+
+
+def test_replicas_are_named_after_the_pool():
+    pool = MCPServerStdioPool(params={"command": "true"}, num_replicas=3, name="amap")
+    assert [replica.name for replica in pool.replicas] == ["amap/0", "amap/1", "amap/2"]
+
+
+def test_calls_go_to_the_least_busy_replica():
+    pool = make_pool(num_replicas=3)
+
+    async def main():
+        await asyncio.gather(
+            *(pool.call_tool("weather", {"city": str(i)}) for i in range(9))
+        )
+
+    asyncio.run(main())
+    assert [len(replica.calls) for replica in pool.replicas] == [3, 3, 3]
+    assert pool._outstanding == [0, 0, 0]
+
+
+def test_idle_pool_reuses_the_first_replica():
+    pool = make_pool(num_replicas=2, delay=0.0)
+
+    async def main():
+        for i in range(3):
+            await pool.call_tool("weather", {"city": str(i)})
+
+    asyncio.run(main())
+    assert [len(replica.calls) for replica in pool.replicas] == [3, 0]
@@ -0,0 +1,47 @@
+import asyncio
+
+from qqr.reward_models.swiss import Player, SwissSystemGroupRewardModel
+
+
+class FakeJudge:
+    def __init__(self):
+        self.matches = []
+
+    async def bidirectional_compare(self, messages_a, messages_b, *, query, i, j):
+        self.matches.append((i, j))
+        return 1.0, 0.0, {"i": i, "j": j}
+
+
+def play_first_round(group_size: int, streaming_window: int) -> list[tuple[int, int]]:
+    judge = FakeJudge()
+    model = SwissSystemGroupRewardModel(judge, streaming_window=streaming_window)
+
+    async def finish(idx: int) -> list[dict]:
+        await asyncio.sleep(0.01 * idx)
+        return [{"role": "assistant", "content": str(idx)}]
+
+    async def main():
+        players = [Player(idx=i) for i in range(group_size)]
+        predictions = [asyncio.ensure_future(finish(i)) for i in range(group_size)]
+        await model.play_first_round_streaming(players, predictions, query="q")
+        return players
+
+    players = asyncio.run(main())
+    # Each match awards one point, and the bye awards one point.
+    assert sum(player.points for player in players) == len(judge.matches) + (
+        group_size % 2
+    )
+    return judge.matches
+
+
+def test_window_of_two_pairs_in_completion_order():
+    matches = play_first_round(group_size=6, streaming_window=2)
+    assert [set(match) for match in matches] == [{0, 1}, {2, 3}, {4, 5}]
+
+
+def test_every_player_plays_once_except_the_bye():
+    for streaming_window in (2, 4, 7):
+        matches = play_first_round(group_size=7, streaming_window=streaming_window)
+        played = [idx for match in matches for idx in match]
+        assert len(matches) == 3
+        assert len(set(played)) == 6
@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from qqr.data.prompts.qwen3 import Qwen3Prompt
+
+
+def tool_call_block(name: str, **arguments) -> str:
+    return (
+        "<tool_call>\n"
+        + json.dumps({"name": name, "arguments": arguments}, ensure_ascii=False)
+        + "\n</tool_call>"
+    )
+
+
+RESPONSES = [
+    "No tools needed.<|im_end|>",
+    "<think>\nLet me check the weather.\n</think>\n\n"
+    + tool_call_block("weather", city="杭州")
+    + "\n"
+    + tool_call_block("poi_search", keywords="西湖")
+    + "<|im_end|>",
+    # Tool calls inside the think block are not dispatched.
+    "<think>I could call " + tool_call_block("weather", city="北京") + "</think>"
+    "\n" + tool_call_block("weather", city="上海") + "<|im_end|>",
+    # Blocks that fail to parse still take a func_idx.
+    "<tool_call>{not json}</tool_call>"
+    + tool_call_block("weather", city="广州")
+    + "<|im_end|>",
+]
+
+
+@pytest.mark.parametrize("response", RESPONSES)
+@pytest.mark.parametrize("chunk_size", [1, 3, 16, 10000])
+def test_scan_matches_full_parse(response, chunk_size):
+    prompter = Qwen3Prompt()
+    scanner = prompter.tool_call_scanner()
+
+    scanned = []
+    for end in range(chunk_size, len(response) + chunk_size, chunk_size):
+        scanned.extend(scanner.scan(response[:end]))
+
+    tool_calls = [tool_call for _, tool_call in scanned if tool_call is not None]
+    assert [func_idx for func_idx, _ in scanned] == list(range(len(scanned)))
+    assert tool_calls == prompter.parse_assistant_content(response)["tool_calls"]
+
+
+def test_scan_waits_for_think_end():
+    scanner = Qwen3Prompt().tool_call_scanner()
+    partial = "<think>" + tool_call_block("weather", city="北京")
+    assert scanner.scan(partial) == []
+    assert scanner.scan(partial + "</think>") == []
+
+    partial += "</think>" + tool_call_block("weather", city="上海")
+    [(func_idx, tool_call)] = scanner.scan(partial)
+    assert func_idx == 0
+    assert json.loads(tool_call["function"]["arguments"]) == {"city": "上海"}
+
+
+def test_scan_only_searches_new_text():
+    scanner = Qwen3Prompt().tool_call_scanner()
+    block = tool_call_block("weather", city="杭州")
+    partial = ""
+    for _ in range(3):
+        partial += block
+        assert len(scanner.scan(partial)) == 1
+    assert scanner._pos == len(partial)